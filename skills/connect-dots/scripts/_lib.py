@@ -1,17 +1,34 @@
 from __future__ import annotations
 
+import contextlib
+import copy
+import functools
+import io
+import itertools
 import json
 import math
 import os
 import re
+import sys
 import tempfile
+import traceback
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional, Tuple
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
 
 import jsonschema
 
+try:  # optional: C-backed JSON codec
+    import orjson
+except ImportError:  # pragma: no cover - stdlib-only environments
+    orjson = None
+
+try:  # optional: code-generated validators are several times faster than jsonschema's interpreter
+    import fastjsonschema
+except ImportError:  # pragma: no cover - stdlib-only environments
+    fastjsonschema = None
+
 ISO_RE = re.compile(r"^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}")
 DATE_ONLY_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
 LINES_RE = re.compile(r"^L(\d+)-L(\d+)$")
@@ -27,52 +44,174 @@ def ensure_aware(dt: datetime) -> datetime:
     return dt.astimezone()
 
 
-def parse_iso(ts: str) -> datetime:
+@functools.lru_cache(maxsize=4096)
+def _parse_iso_cached(raw: str) -> datetime:
+    # Raises on garbage; datetimes are immutable so cached results are safe to share.
+    if DATE_ONLY_RE.match(raw):
+        return ensure_aware(datetime.fromisoformat(raw))
+    if raw.endswith("Z"):
+        raw = raw[:-1] + "+00:00"
+    return ensure_aware(datetime.fromisoformat(raw))
+
+
+def parse_iso(ts: str, default: datetime | None = None) -> datetime:
     # Best-effort: accept common ISO/date-only strings and always return a tz-aware datetime.
     try:
-        raw = (ts or "").strip()
-        if DATE_ONLY_RE.match(raw):
-            return ensure_aware(datetime.fromisoformat(raw))
-        return ensure_aware(datetime.fromisoformat(raw.replace("Z", "+00:00")))
+        return _parse_iso_cached((ts or "").strip())
     except Exception:
-        # Fall back to "now" if it's garbage.
+        # Fall back to `default`, or "now" if it's garbage.
+        if default is not None:
+            return default
         return datetime.now(timezone.utc).astimezone()
 
 
+def dumps_json_bytes(data: Any) -> bytes:
+    """Pretty-printed UTF-8 JSON with a trailing newline (the on-disk format for every store)."""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE | orjson.OPT_NON_STR_KEYS)
+    return (json.dumps(data, ensure_ascii=False, indent=2) + "\n").encode("utf-8")
+
+
 def atomic_write_json(path: Path, data: Any) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
+    buf = dumps_json_bytes(data)
     fd, tmp = tempfile.mkstemp(prefix=path.name + ".", suffix=".tmp", dir=str(path.parent))
     try:
-        with os.fdopen(fd, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-            f.write("\n")
+        try:
+            view = memoryview(buf)
+            while view:
+                view = view[os.write(fd, view):]
+            # Durable before it becomes visible under the real name.
+            os.fsync(fd)
+        finally:
+            os.close(fd)
         os.replace(tmp, path)
-    finally:
+    except BaseException:
         try:
-            if os.path.exists(tmp):
-                os.unlink(tmp)
-        except Exception:
+            os.unlink(tmp)
+        except OSError:
             pass
+        raise
+
+
+def clone_json(data: Any) -> Any:
+    """Deep copy for JSON-shaped data; a codec round-trip beats copy.deepcopy's per-object dispatch.
+
+    Data orjson cannot encode (ints beyond 64 bits, non-str keys) falls back to copy.deepcopy.
+    orjson encodes NaN/Infinity as null, as dumps_json_bytes does when writing the copy out.
+    """
+    if orjson is not None:
+        try:
+            return orjson.loads(orjson.dumps(data))
+        except TypeError:  # orjson.JSONEncodeError is a TypeError
+            return copy.deepcopy(data)
+    return json.loads(json.dumps(data))
+
+
+def loads_json_bytes(buf: bytes | str) -> Any:
+    """Parse JSON with orjson when available, else the stdlib.
+
+    Documents orjson rejects (NaN/Infinity literals, which json.dumps writes) are re-read with the
+    stdlib. One difference remains: orjson reads integers beyond 64 bits as floats.
+    """
+    if orjson is not None:
+        try:
+            return orjson.loads(buf)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(buf)
 
 
 def load_json(path: Path, default: Any = None) -> Any:
     if not path.exists():
         return default
-    with path.open("r", encoding="utf-8") as f:
-        return json.load(f)
+    return loads_json_bytes(path.read_bytes())
+
+
+def load_json_arg(arg: str, default: Any = None) -> Any:
+    """Like load_json for a CLI path argument, except "-" reads the document from stdin."""
+    if arg == "-":
+        data = sys.stdin.read()
+        return loads_json_bytes(data) if data.strip() else default
+    return load_json(Path(arg), default=default)
 
 
 def load_schema(schema_path: Path) -> Dict[str, Any]:
-    with schema_path.open("r", encoding="utf-8") as f:
-        return json.load(f)
+    return loads_json_bytes(schema_path.read_bytes())
+
+
+# Compiled validators keyed by (resolved schema path, mtime_ns, size, inode); edits to a schema invalidate
+# its entry even when mtime granularity hides them.
+# Each entry is a callable returning None when the instance is valid, else "<message> (at <path>)".
+_VALIDATOR_CACHE: Dict[Tuple[str, int, int, int], Any] = {}
+
+
+def _compile_validator(schema: Dict[str, Any]) -> Any:
+    cls = jsonschema.validators.validator_for(schema)
+    cls.check_schema(schema)
+    validator = cls(schema)
+
+    def explain(instance: Any) -> Optional[str]:
+        # Same error selection as jsonschema.validate, minus the per-call metaschema check.
+        e = jsonschema.exceptions.best_match(validator.iter_errors(instance))
+        if e is None:
+            return None
+        return f"{e.message} (at {list(e.absolute_path)})"
+
+    if fastjsonschema is None:
+        return explain
+
+    fast = fastjsonschema.compile(schema)
+
+    def check(instance: Any) -> Optional[str]:
+        # fastjsonschema only answers pass/fail; failures are rare, so re-run jsonschema for the message.
+        try:
+            fast(instance)
+        except fastjsonschema.JsonSchemaValueException as e:
+            return explain(instance) or f"{e.message} (at {e.path[1:]})"
+        return None
+
+    return check
+
+
+def get_validator(schema_path: Path) -> Any:
+    st = schema_path.stat()
+    key = (str(schema_path.resolve()), st.st_mtime_ns, st.st_size, st.st_ino)
+    validator = _VALIDATOR_CACHE.get(key)
+    if validator is None:
+        validator = _compile_validator(load_schema(schema_path))
+        _VALIDATOR_CACHE[key] = validator
+    return validator
 
 
 def validate_or_die(instance: Any, schema_path: Path, label: str) -> None:
-    schema = load_schema(schema_path)
-    try:
-        jsonschema.validate(instance=instance, schema=schema)
-    except jsonschema.ValidationError as e:
-        raise SystemExit(f"invalid {label}: {e.message} (at {list(e.absolute_path)})")
+    err = get_validator(schema_path)(instance)
+    if err is not None:
+        raise SystemExit(f"invalid {label}: {err}")
+
+
+def run_main(main: Callable[[Optional[List[str]]], Optional[int]], argv: List[str]) -> Tuple[int, str, str]:
+    """Call a script's `main(argv)` in-process and return (exit code, stdout, stderr) like a subprocess would.
+
+    stdout/stderr are captured while `main` runs, so argparse usage errors and anything the script
+    prints come back as text. Fail-closed exits (`raise SystemExit("msg")`) add "msg" to stderr with
+    code 1; unexpected errors add a traceback. The redirect is process-global: don't call this from
+    concurrent threads.
+    """
+    out, err = io.StringIO(), io.StringIO()
+    with contextlib.redirect_stdout(out), contextlib.redirect_stderr(err):
+        try:
+            code = main(argv) or 0
+        except SystemExit as e:
+            if e.code is None or isinstance(e.code, int):
+                code = e.code or 0
+            else:
+                print(e.code, file=sys.stderr)
+                code = 1
+        except Exception:
+            traceback.print_exc()
+            code = 1
+    return code, out.getvalue(), err.getvalue()
 
 
 def clamp(x: float, lo: float, hi: float) -> float:
@@ -80,14 +219,28 @@ def clamp(x: float, lo: float, hi: float) -> float:
 
 
 def matches_do_not_store(text: str, dns: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
-    t = (text or "").lower()
-    for rule in dns or []:
-        pat = (rule.get("pattern") or "").lower()
-        if not pat:
-            continue
-        if pat in t:
-            return rule
-    return None
+    """One-off check of `text` against do_not_store rules; compile once with compile_do_not_store for many texts."""
+    return compile_do_not_store(dns)(text)
+
+
+def compile_do_not_store(dns: List[Dict[str, Any]]) -> Callable[[str], Optional[Dict[str, Any]]]:
+    """Build a matcher returning the do_not_store rule whose pattern occurs in the text (case-insensitive), or None.
+
+    All patterns go into one alternation regex so the text is scanned once; the named group
+    that matched identifies the rule (leftmost match wins when several rules apply).
+    """
+    rules = [rule for rule in dns or [] if (rule.get("pattern") or "")]
+    if not rules:
+        return lambda text: None
+    regex = re.compile(
+        "|".join(f"(?P<r{i}>{re.escape(rule['pattern'].lower())})" for i, rule in enumerate(rules))
+    )
+
+    def match(text: str) -> Optional[Dict[str, Any]]:
+        m = regex.search((text or "").lower())
+        return rules[int(m.lastgroup[1:])] if m else None
+
+    return match
 
 
 def compute_recency_days(evidence: List[Dict[str, Any]], now: datetime) -> float:
@@ -106,22 +259,10 @@ def compute_recency_days(evidence: List[Dict[str, Any]], now: datetime) -> float
     return max(0.0, (now - best).total_seconds() / 86400.0)
 
 
-def confidence_formula(
-    *,
-    evidence: List[Dict[str, Any]],
-    user_confirmed: bool = False,
-    conflicts: bool = False,
-    now: datetime,
-) -> float:
-    """Deterministic confidence approximation.
-
-    Intentionally simple: it is auditable + stable.
-    """
-    sources = len(evidence or [])
+def _confidence_score(sources: int, rec_days: float, user_confirmed: bool, conflicts: bool) -> float:
     sources_cap = min(5, sources)
 
     # Recency score: exp decay with ~7 day half-life.
-    rec_days = compute_recency_days(evidence, now)
     recency_score = math.exp(-rec_days / 7.0) if rec_days < 9999 else 0.0
 
     agreement = 0.15 if sources >= 2 else 0.0
@@ -136,18 +277,77 @@ def confidence_formula(
     return clamp(conf, 0.05, 0.99)
 
 
+def confidence_formula(
+    *,
+    evidence: List[Dict[str, Any]],
+    user_confirmed: bool = False,
+    conflicts: bool = False,
+    now: datetime,
+) -> float:
+    """Deterministic confidence approximation.
+
+    Intentionally simple: it is auditable + stable.
+    """
+    rec_days = compute_recency_days(evidence, now)
+    return _confidence_score(len(evidence or []), rec_days, user_confirmed, conflicts)
+
+
+def confidence_batch(
+    rows: Iterable[Tuple[List[Dict[str, Any]], bool, bool]],
+    *,
+    now: datetime,
+) -> List[float]:
+    """`confidence_formula` over many (evidence, user_confirmed, conflicts) rows.
+
+    `now` is normalized once and timestamps are compared as epoch floats, so the per-row
+    cost is the cached ISO parse plus the scalar formula.
+    """
+    now_ts = ensure_aware(now).timestamp()
+    out = []
+    for evidence, user_confirmed, conflicts in rows:
+        newest = max((parse_iso(ev["ts"]).timestamp() for ev in evidence or [] if ev.get("ts")), default=None)
+        rec_days = 9999.0 if newest is None else max(0.0, (now_ts - newest) / 86400.0)
+        out.append(_confidence_score(len(evidence or []), rec_days, user_confirmed, conflicts))
+    return out
+
+
 def parse_lines_spec(lines: str) -> Tuple[int, int]:
-    m = LINES_RE.match(lines or "")
-    if not m:
+    # Hand-rolled equivalent of LINES_RE (L<int>-L<int>); this runs once per evidence entry.
+    spec = lines or ""
+    dash = spec.find("-L", 1)
+    head, tail = spec[1:dash], spec[dash + 2 :]
+    if not spec.startswith("L") or dash < 0 or not head.isdecimal() or not tail.isdecimal():
         raise ValueError(f"bad lines spec: {lines}")
-    a = int(m.group(1))
-    b = int(m.group(2))
+    a = int(head)
+    b = int(tail)
     if a <= 0 or b < a:
         raise ValueError(f"bad lines range: {lines}")
     return a, b
 
 
-def verify_evidence_sources(evidence: List[Dict[str, Any]], workspace: Path) -> None:
+@functools.lru_cache(maxsize=256)
+def _read_text_with_offsets_cached(path_str: str, mtime_ns: int, size: int, ino: int) -> Tuple[str, Tuple[int, ...]]:
+    # The stat fields are part of the key only, so an edited or replaced file misses the cache
+    # even when the edit lands within the filesystem's mtime granularity.
+    with open(path_str, "r", encoding="utf-8", errors="ignore") as f:
+        lines = f.readlines()
+    return "".join(lines), tuple(itertools.accumulate(map(len, lines), initial=0))
+
+
+def read_text_with_offsets(path: Path) -> Tuple[str, Tuple[int, ...]]:
+    """Return (full text, line start offsets); offsets[i] is where line i+1 starts, offsets[-1] == len(text).
+
+    Cached process-wide by (path, mtime, size, inode), so repeated builds in one process read each file once.
+    """
+    st = path.stat()
+    return _read_text_with_offsets_cached(str(path), st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+def verify_evidence_sources(
+    evidence: List[Dict[str, Any]],
+    workspace: Path,
+    file_cache: Optional[Dict[str, Tuple[str, Tuple[int, ...]]]] = None,
+) -> None:
     """Fail closed unless evidence is auditable.
 
     Enforces:
@@ -156,31 +356,44 @@ def verify_evidence_sources(evidence: List[Dict[str, Any]], workspace: Path) ->
     - quote appears within the cited line range
 
     This is the hard guard behind "every non-trivial item needs a citation".
+
+    Pass the same `file_cache` dict across calls (same workspace) to resolve and read each
+    cited path once per run; hits skip the path syscalls entirely.
     """
-    ws = workspace.resolve()
+    ws_str = None
     for ev in evidence or []:
         p = ev.get("path")
         if not p:
             raise SystemExit("evidence missing path")
-        full = (workspace / p).resolve()
-        if not str(full).startswith(str(ws)):
-            raise SystemExit(f"evidence path escapes workspace: {p}")
-        if not full.exists():
-            raise SystemExit(f"evidence file not found: {p}")
+
+        cached = file_cache.get(p) if file_cache is not None else None
+        if cached is None:
+            if ws_str is None:
+                ws_str = str(workspace.resolve())
+            # resolve() (not normpath) so symlinks cannot smuggle reads outside the workspace.
+            full = str((workspace / p).resolve())
+            # commonpath rather than a "ws/" prefix test, which would reject everything when ws is "/".
+            if os.path.commonpath([ws_str, full]) != ws_str:
+                raise SystemExit(f"evidence path escapes workspace: {p}")
+            if not os.path.isfile(full):
+                raise SystemExit(f"evidence file not found: {p}")
 
         a, b = parse_lines_spec(ev.get("lines", ""))
         quote = (ev.get("quote") or "").strip()
         if not quote:
             raise SystemExit(f"evidence quote missing: {p} {ev.get('lines')}")
 
-        with full.open("r", encoding="utf-8", errors="ignore") as f:
-            lines = f.readlines()
-        n = len(lines)
+        if cached is None:
+            cached = read_text_with_offsets(Path(full))
+            if file_cache is not None:
+                file_cache[p] = cached
+        text, offsets = cached
+        n = len(offsets) - 1
         if b > n:
             raise SystemExit(f"evidence line range out of bounds: {p} {ev.get('lines')} (file has {n} lines)")
 
-        snippet = "".join(lines[a - 1 : b])
-        if quote not in snippet:
+        # Bounded C-level search over the cited range; no per-evidence snippet copy.
+        if text.find(quote, offsets[a - 1], offsets[b]) < 0:
             raise SystemExit(
                 f"evidence quote not found in cited range: {p} {ev.get('lines')} (quote='{quote[:80]}...')"
             )
@@ -219,9 +432,10 @@ def normalize_item_common(
     keep_first_seen: Optional[str],
 ) -> Dict[str, Any]:
     out = dict(item)
+    now_str = now_dt.isoformat(timespec="seconds")
 
-    out.setdefault("first_seen", keep_first_seen or now_dt.isoformat(timespec="seconds"))
-    out["last_seen"] = now_dt.isoformat(timespec="seconds")
+    out.setdefault("first_seen", keep_first_seen or now_str)
+    out["last_seen"] = now_str
 
     ttl_days = int(out.get("ttl_days") or default_ttl_days)
     ttl_days = max(1, ttl_days)
@@ -8,7 +8,7 @@ Design goal (locked by JD):
 
 Inputs:
 - Existing model.json (optional)
-- Proposal.json (required) following references/proposal.schema.json
+- Proposal.json (required) following references/proposal.schema.json; `--proposal -` reads it from stdin
 
 Writes:
 - Updated model.json (atomic)
@@ -26,59 +26,77 @@ Usage:
 from __future__ import annotations
 
 import argparse
-import copy
 from datetime import datetime, timedelta, timezone
+from itertools import islice
 from pathlib import Path
 
 from _lib import (
     atomic_write_json,
-    confidence_formula,
+    clone_json,
+    compile_do_not_store,
+    confidence_batch,
     ensure_model_skeleton,
     index_by_id,
     load_json,
+    load_json_arg,
     now_iso,
     normalize_item_common,
     parse_iso,
+    run_main,
     validate_or_die,
-    matches_do_not_store,
     verify_evidence_sources,
 )
 
 
-def _merge_list(*, current, proposed, section: str):
-    """Merge by id: proposed overrides statement/why/confirm/evidence; preserves first_seen when present."""
-    cur_idx = index_by_id(current)
-    out = []
-
-    for p in proposed:
-        pid = p.get("id")
-        if not pid:
-            continue
-        existing = cur_idx.get(pid)
-        keep_first = existing.get("first_seen") if existing else None
-        keep_domain = existing.get("domain") if existing else None
-
-        merged = dict(p)
-        if keep_domain and not merged.get("domain"):
-            merged["domain"] = keep_domain
-        merged["_keep_first_seen"] = keep_first
-        merged["_refreshed"] = True
-        out.append(merged)
-
-    # keep any current items not mentioned in proposal
-    proposed_ids = {p.get("id") for p in proposed if isinstance(p, dict)}
-    for it in current:
-        if not isinstance(it, dict):
-            continue
-        if it.get("id") and it.get("id") not in proposed_ids:
-            kept = dict(it)
-            kept["_refreshed"] = False
-            out.append(kept)
-
-    return out
-
-
-def main() -> int:
+MERGE_SECTIONS = ("confirmed_facts", "hypotheses", "open_loops", "candidate_moves")
+
+
+def _merge_all(model, items, sections=MERGE_SECTIONS, verify=None):
+    """Merge every section by id in place: proposed overrides statement/why/confirm/evidence; preserves first_seen when present.
+
+    `verify(item)` is applied to each proposed item as it enters; kept items were verified on a prior run.
+    """
+    for section in sections:
+        current = model.get(section) or []
+        proposed = items.get(section) or []
+        cur_idx = index_by_id(current)
+        proposed_ids = set()
+        out = []
+
+        for p in proposed:
+            if not isinstance(p, dict):
+                continue
+            pid = p.get("id")
+            proposed_ids.add(pid)
+            if not pid:
+                continue
+            if verify is not None:
+                verify(p)
+            existing = cur_idx.get(pid)
+            keep_first = existing.get("first_seen") if existing else None
+            keep_domain = existing.get("domain") if existing else None
+
+            merged = dict(p)
+            if keep_domain and not merged.get("domain"):
+                merged["domain"] = keep_domain
+            merged["_keep_first_seen"] = keep_first
+            merged["_refreshed"] = True
+            out.append(merged)
+
+        # keep any current items not mentioned in proposal
+        for it in current:
+            if not isinstance(it, dict):
+                continue
+            if it.get("id") and it.get("id") not in proposed_ids:
+                kept = dict(it)
+                kept["_refreshed"] = False
+                out.append(kept)
+
+        model[section] = out
+
+
+def main(argv: list[str] | None = None, *, proposal: dict | None = None) -> int:
+    """`proposal` lets in-process callers pass the already-parsed --proposal file."""
     ap = argparse.ArgumentParser()
     ap.add_argument("--scope", required=True)
     ap.add_argument("--workspace", required=True, help="OpenClaw workspace root")
@@ -96,17 +114,18 @@ def main() -> int:
     ap.add_argument("--diff-out")
     ap.add_argument("--verify-sources", action="store_true", default=True)
     ap.add_argument("--no-verify-sources", dest="verify_sources", action="store_false")
-    args = ap.parse_args()
+    args = ap.parse_args(argv)
 
     workspace = Path(args.workspace).resolve()
     model_path = Path(args.model)
-    prop_path = Path(args.proposal)
+    prop_label = "<stdin>" if args.proposal == "-" else args.proposal
 
-    proposal = load_json(prop_path, default=None)
+    if proposal is None:
+        proposal = load_json_arg(args.proposal, default=None)
     if not proposal:
-        raise SystemExit(f"proposal missing/empty: {prop_path}")
+        raise SystemExit(f"proposal missing/empty: {prop_label}")
 
-    validate_or_die(proposal, Path(args.proposal_schema), label=f"proposal ({prop_path})")
+    validate_or_die(proposal, Path(args.proposal_schema), label=f"proposal ({prop_label})")
 
     if proposal.get("scope") != args.scope:
         raise SystemExit(f"proposal scope mismatch: expected {args.scope}, got {proposal.get('scope')}")
@@ -115,74 +134,74 @@ def main() -> int:
     if not prev_model:
         model = ensure_model_skeleton(args.scope)
     else:
-        model = copy.deepcopy(prev_model)
+        model = clone_json(prev_model)
 
     # Always refresh updatedAt.
     model["updatedAt"] = now_iso()
 
     # Merge do_not_store as-is (LLM should not mutate it; only consent_mutations should).
     dns = model.get("do_not_store") or []
+    match_do_not_store = compile_do_not_store(dns)
 
     items = proposal["items"]
 
+    # Cited memory files are shared across many items; read each once per run.
+    file_cache = {}
+
+    def verify_sources(item):
+        # do_not_store hits are dropped in process_section; a blocked statement must not fail the build.
+        if match_do_not_store(item.get("statement") or item.get("fact") or ""):
+            return
+        verify_evidence_sources(item.get("evidence") or [], workspace, file_cache=file_cache)
+
+    verify = verify_sources if args.verify_sources else None
+
     # Merge lists by id.
-    model["confirmed_facts"] = _merge_list(
-        current=model.get("confirmed_facts") or [],
-        proposed=items.get("confirmed_facts") or [],
-        section="confirmed_facts",
-    )
-    model["hypotheses"] = _merge_list(
-        current=model.get("hypotheses") or [],
-        proposed=items.get("hypotheses") or [],
-        section="hypotheses",
-    )
-    model["open_loops"] = _merge_list(
-        current=model.get("open_loops") or [],
-        proposed=items.get("open_loops") or [],
-        section="open_loops",
-    )
-    model["candidate_moves"] = _merge_list(
-        current=model.get("candidate_moves") or [],
-        proposed=items.get("candidate_moves") or [],
-        section="candidate_moves",
-    )
+    _merge_all(model, items, verify=verify)
 
     now_dt = datetime.now(timezone.utc).astimezone()
+    now_str = now_dt.isoformat(timespec="seconds")
+    expiry_by_ttl = {}
+
+    def expires_in(ttl_days: int) -> str:
+        ttl_days = max(1, ttl_days)
+        if ttl_days not in expiry_by_ttl:
+            expiry_by_ttl[ttl_days] = (now_dt + timedelta(days=ttl_days)).isoformat(timespec="seconds")
+        return expiry_by_ttl[ttl_days]
 
     def process_section(section: str, default_ttl_days: int):
         processed = []
+        # (out, evidence, user_confirmed, conflicts) for refreshed items; scored in one batch below.
+        to_score = []
         for it in model.get(section) or []:
             if not isinstance(it, dict):
                 continue
 
             # do-not-store filter
             stmt = it.get("statement") or it.get("fact") or ""
-            hit = matches_do_not_store(stmt, dns)
+            hit = match_do_not_store(stmt)
             if hit:
                 # drop silently; do_not_store should prevent storage.
                 continue
 
             evidence = it.get("evidence") or []
-            if args.verify_sources:
-                verify_evidence_sources(evidence, workspace)
 
             keep_first = it.pop("_keep_first_seen", None)
             refreshed = bool(it.pop("_refreshed", False))
 
             if section == "confirmed_facts":
                 # Facts are stable; only refresh timestamps/expiry if refreshed.
+                # setdefault only fills absent keys, so plain defaults suffice (no out.get round-trips).
                 out = dict(it)
                 out.setdefault("confidence", 0.99)
-                out.setdefault("first_seen", keep_first or out.get("first_seen") or now_dt.isoformat(timespec="seconds"))
+                out.setdefault("first_seen", keep_first or now_str)
                 if refreshed:
-                    out["last_seen"] = now_dt.isoformat(timespec="seconds")
-                    ttl_days = int(out.get("ttl_days") or default_ttl_days)
-                    out.pop("ttl_days", None)
-                    out["expires_at"] = (now_dt + timedelta(days=max(1, ttl_days))).isoformat(timespec="seconds")
+                    out["last_seen"] = now_str
+                    out["expires_at"] = expires_in(int(out.pop("ttl_days", None) or default_ttl_days))
                 else:
-                    out.setdefault("last_seen", out.get("last_seen") or now_dt.isoformat(timespec="seconds"))
-                    out.setdefault("expires_at", out.get("expires_at") or "9999-12-31T00:00:00+00:00")
-                out.setdefault("last_confirmed", out.get("last_confirmed") or out.get("last_seen") or now_dt.isoformat(timespec="seconds"))
+                    out.setdefault("last_seen", now_str)
+                    out.setdefault("expires_at", "9999-12-31T00:00:00+00:00")
+                out.setdefault("last_confirmed", out["last_seen"] or now_str)
                 out.setdefault("status", "active")
                 processed.append(out)
                 continue
@@ -196,26 +215,23 @@ def main() -> int:
                     keep_first_seen=keep_first,
                 )
 
-                # Deterministic confidence recompute
-                out["confidence"] = confidence_formula(
-                    evidence=evidence,
-                    user_confirmed=bool(it.get("user_confirmed")),
-                    conflicts=bool(it.get("conflicts")),
-                    now=now_dt,
-                )
-                out.pop("user_confirmed", None)
-                out.pop("conflicts", None)
+                to_score.append((out, evidence, bool(out.pop("user_confirmed", None)), bool(out.pop("conflicts", None))))
             else:
                 # Not refreshed: do not extend TTL.
                 out = dict(it)
-                out.setdefault("first_seen", keep_first or out.get("first_seen") or now_dt.isoformat(timespec="seconds"))
-                out.setdefault("last_seen", out.get("last_seen") or now_dt.isoformat(timespec="seconds"))
-                out.setdefault("expires_at", out.get("expires_at") or now_dt.isoformat(timespec="seconds"))
-                out.setdefault("status", out.get("status") or "active")
-                out.setdefault("confidence", float(out.get("confidence") or 0.2))
+                out.setdefault("first_seen", keep_first or now_str)
+                out.setdefault("last_seen", now_str)
+                out.setdefault("expires_at", now_str)
+                out.setdefault("status", "active")
+                out.setdefault("confidence", 0.2)
 
             processed.append(out)
 
+        # Deterministic confidence recompute
+        scores = confidence_batch((row[1:] for row in to_score), now=now_dt)
+        for (out, _, _, _), conf in zip(to_score, scores):
+            out["confidence"] = conf
+
         model[section] = processed
 
     # Apply processing
@@ -225,7 +241,21 @@ def main() -> int:
     process_section("candidate_moves", default_ttl_days=7)
 
     # TTL decay: move expired items to stale_items, cap confidence.
-    stale = model.get("stale_items") or []
+    # stale_items is deduplicated by id as we go, keeping the newest last_seen;
+    # a missing or unparseable last_seen counts as oldest so undated copies never win.
+    stale_by_id = {}
+    undated = datetime.min.replace(tzinfo=timezone.utc)
+
+    def add_stale(it):
+        if not it.get("id"):
+            return
+        prev = stale_by_id.get(it["id"])
+        if not prev or parse_iso(it.get("last_seen"), undated) > parse_iso(prev.get("last_seen"), undated):
+            stale_by_id[it["id"]] = it
+
+    for it in model.get("stale_items") or []:
+        if isinstance(it, dict):
+            add_stale(it)
 
     def is_expired(it):
         try:
@@ -234,39 +264,35 @@ def main() -> int:
         except Exception:
             return False
 
-    def move_to_stale(section):
-        keep = []
-        for it in model.get(section) or []:
+    def sweep(section):
+        # Single pass, compacting kept items in place (no second list).
+        items = model.get(section) or []
+        w = 0
+        for it in items:
             if not isinstance(it, dict):
                 continue
             if it.get("status") == "retracted":
                 # keep retracted only in stale for audit
                 it2 = dict(it)
                 it2["status"] = "retracted"
-                stale.append(it2)
+                add_stale(it2)
                 continue
             if is_expired(it):
                 it2 = dict(it)
                 it2["status"] = "stale"
                 it2["confidence"] = min(float(it2.get("confidence") or 0.0), 0.35)
-                stale.append(it2)
+                add_stale(it2)
             else:
-                keep.append(it)
-        model[section] = keep
-
-    move_to_stale("hypotheses")
-    move_to_stale("open_loops")
-    move_to_stale("candidate_moves")
-
-    # Deduplicate stale by id, keeping the newest last_seen.
-    by_id = {}
-    for it in stale:
-        if not isinstance(it, dict) or not it.get("id"):
-            continue
-        cur = by_id.get(it["id"])
-        if not cur or (it.get("last_seen") or "") > (cur.get("last_seen") or ""):
-            by_id[it["id"]] = it
-    model["stale_items"] = list(by_id.values())
+                items[w] = it
+                w += 1
+        del items[w:]
+        model[section] = items
+
+    sweep("hypotheses")
+    sweep("open_loops")
+    sweep("candidate_moves")
+
+    model["stale_items"] = list(stale_by_id.values())
 
     # Validate final model
     validate_or_die(model, Path(args.model_schema), label=f"model ({model_path})")
@@ -283,20 +309,27 @@ def main() -> int:
         prev_idx = index_by_id((prev_model.get("hypotheses") or []) + (prev_model.get("confirmed_facts") or []))
         cur_idx = index_by_id((model.get("hypotheses") or []) + (model.get("confirmed_facts") or []))
 
-        added = [k for k in cur_idx.keys() if k not in prev_idx]
-        retracted = [k for k, v in cur_idx.items() if v.get("status") == "retracted"]
-
-        lines = []
-        for k in added[:10]:
+        # Every bucket is capped at 10 and built lazily, so work and output stay bounded on large models.
+        added = islice((k for k in cur_idx if k not in prev_idx), 10)
+        updated = islice(
+            (
+                k
+                for k, v in cur_idx.items()
+                if k in prev_idx
+                and (v.get("statement") != prev_idx[k].get("statement") or v.get("confidence") != prev_idx[k].get("confidence"))
+            ),
+            10,
+        )
+        retracted = islice((k for k, v in cur_idx.items() if v.get("status") == "retracted"), 10)
+
+        def label(k):
             it = cur_idx[k]
-            lines.append(f"+ {it.get('statement') or it.get('fact') or k}")
+            return it.get("statement") or it.get("fact") or k
+
+        lines = [f"+ {label(k)}" for k in added]
         # updated = heuristic
-        for k in cur_idx.keys():
-            if k in prev_idx and (cur_idx[k].get("statement") != prev_idx[k].get("statement") or cur_idx[k].get("confidence") != prev_idx[k].get("confidence")):
-                lines.append(f"~ {cur_idx[k].get('statement') or cur_idx[k].get('fact') or k}")
-        for k in retracted[:10]:
-            it = cur_idx[k]
-            lines.append(f"- {it.get('statement') or it.get('fact') or k}")
+        lines.extend(f"~ {label(k)}" for k in updated)
+        lines.extend(f"- {label(k)}" for k in retracted)
         if not lines:
             lines.append("(no material changes)")
         Path(args.diff_out).parent.mkdir(parents=True, exist_ok=True)
@@ -305,5 +338,10 @@ def main() -> int:
     return 0
 
 
+def run(argv: list[str], *, proposal: dict | None = None) -> tuple[int, str, str]:
+    """In-process entry point for callers that would otherwise spawn this script."""
+    return run_main(lambda a: main(a, proposal=proposal), argv)
+
+
 if __name__ == "__main__":
     raise SystemExit(main())
@@ -13,6 +13,12 @@ Usage:
   consent_mutations.py --model model.json --op forget --match "some text"
   consent_mutations.py --model model.json --op confirm --id <hyp-id> [--fact "..." --value "..."]
   consent_mutations.py --model model.json --op deny --id <item-id>
+  consent_mutations.py --model model.json --batch ops.jsonl
+
+--batch reads one op per line as JSON, using the flag names as keys, e.g.
+  {"op": "dont-store", "pattern": "secret"}
+  {"op": "confirm", "id": "<hyp-id>", "value": "..."}
+Ops apply in order to the same in-memory model; if any op fails, nothing is written.
 
 By default updates the file in-place (atomic).
 """
@@ -20,7 +26,7 @@ By default updates the file in-place (atomic).
 from __future__ import annotations
 
 import argparse
-from copy import deepcopy
+import json
 from datetime import datetime, timezone
 from pathlib import Path
 
@@ -30,118 +36,170 @@ from _lib import (
     ensure_model_skeleton,
     index_by_id,
     load_json,
+    loads_json_bytes,
     now_iso,
     validate_or_die,
 )
 
 
-def _find_item(model, item_id: str):
-    for section in ("hypotheses", "stale_items", "open_loops", "candidate_moves", "confirmed_facts"):
-        for it in model.get(section) or []:
-            if isinstance(it, dict) and it.get("id") == item_id:
-                return section, it
-    return None, None
+SECTIONS = ("hypotheses", "stale_items", "open_loops", "candidate_moves", "confirmed_facts")
+OPS = ("dont-store", "forget", "confirm", "deny")
+OP_FIELDS = ("pattern", "domain", "note", "id", "match", "fact", "value")
 
 
-def main() -> int:
-    ap = argparse.ArgumentParser()
-    ap.add_argument("--model", required=True)
-    ap.add_argument(
-        "--schema",
-        default=str(Path(__file__).resolve().parent.parent / "references" / "model.schema.json"),
-    )
-    ap.add_argument("--op", required=True, choices=["dont-store", "forget", "confirm", "deny"])
-    ap.add_argument("--pattern")
-    ap.add_argument("--domain")
-    ap.add_argument("--note")
-    ap.add_argument("--id")
-    ap.add_argument("--match")
-    ap.add_argument("--fact")
-    ap.add_argument("--value")
-    args = ap.parse_args()
+def _build_index(model):
+    """id -> (section, item); first hit in SECTIONS order wins."""
+    idx = {}
+    for section in SECTIONS:
+        for it in model.get(section) or []:
+            if isinstance(it, dict) and it.get("id"):
+                idx.setdefault(it["id"], (section, it))
+    return idx
 
-    model_path = Path(args.model)
-    model = load_json(model_path, default=None)
-    if not model:
-        raise SystemExit(f"model not found or empty: {model_path}")
 
-    out = deepcopy(model)
-    out["updatedAt"] = now_iso()
+def _apply(out, op, idx) -> None:
+    """Apply one consent op to the model in place; fail-closed via SystemExit.
 
-    if args.op == "dont-store":
-        if not args.pattern:
+    `idx` is the _build_index() of `out`, kept current here when an op moves an item.
+    """
+    if op.op == "dont-store":
+        if not op.pattern:
             raise SystemExit("dont-store requires --pattern")
         out.setdefault("do_not_store", [])
         rule = {
-            "pattern": args.pattern,
+            "pattern": op.pattern,
             "created_at": now_iso(),
         }
-        if args.domain:
-            rule["domain"] = args.domain
-        if args.note:
-            rule["note"] = args.note
+        if op.domain:
+            rule["domain"] = op.domain
+        if op.note:
+            rule["note"] = op.note
         out["do_not_store"].append(rule)
 
-    elif args.op == "deny":
-        if not args.id:
+    elif op.op == "deny":
+        if not op.id:
             raise SystemExit("deny requires --id")
-        sec, it = _find_item(out, args.id)
+        sec, it = idx.get(op.id, (None, None))
         if not it:
-            raise SystemExit(f"id not found: {args.id}")
+            raise SystemExit(f"id not found: {op.id}")
         it["status"] = "retracted"
 
-    elif args.op == "forget":
-        if not (args.id or args.match):
+    elif op.op == "forget":
+        if not (op.id or op.match):
             raise SystemExit("forget requires --id or --match")
-        if args.id:
-            sec, it = _find_item(out, args.id)
+        if op.id:
+            sec, it = idx.get(op.id, (None, None))
             if not it:
-                raise SystemExit(f"id not found: {args.id}")
+                raise SystemExit(f"id not found: {op.id}")
             it["status"] = "retracted"
         else:
-            needle = args.match.lower()
+            needle = op.match.lower()
             hit = False
-            for sec in ("hypotheses", "stale_items", "open_loops", "candidate_moves", "confirmed_facts"):
+            for sec in SECTIONS:
                 for it in out.get(sec) or []:
-                    if not isinstance(it, dict):
-                        continue
-                    s = (it.get("statement") or it.get("fact") or "").lower()
-                    if needle in s:
+                    if isinstance(it, dict) and needle in (it.get("statement") or it.get("fact") or "").lower():
                         it["status"] = "retracted"
                         hit = True
             if not hit:
-                raise SystemExit(f"no matches for: {args.match}")
+                raise SystemExit(f"no matches for: {op.match}")
 
-    elif args.op == "confirm":
-        if not args.id:
+    elif op.op == "confirm":
+        if not op.id:
             raise SystemExit("confirm requires --id")
-        sec, it = _find_item(out, args.id)
+        sec, it = idx.get(op.id, (None, None))
         if not it:
-            raise SystemExit(f"id not found: {args.id}")
+            raise SystemExit(f"id not found: {op.id}")
         # Promote to confirmed_facts.
-        fact = args.fact or it.get("statement")
+        fact = op.fact or it.get("statement")
         if not fact:
             raise SystemExit("confirm requires --fact or statement")
-        value = args.value
+        value = op.value
         # Remove from hypotheses-like section.
         for s in ("hypotheses", "stale_items", "open_loops", "candidate_moves"):
-            out[s] = [x for x in (out.get(s) or []) if not (isinstance(x, dict) and x.get("id") == args.id)]
+            out[s] = [x for x in (out.get(s) or []) if not (isinstance(x, dict) and x.get("id") == op.id)]
         out.setdefault("confirmed_facts", [])
-        out["confirmed_facts"].append(
-            {
-                "id": args.id,
-                "fact": fact,
-                "value": value,
-                "domain": it.get("domain", ""),
-                "confidence": 0.99,
-                "first_seen": it.get("first_seen") or now_iso(),
-                "last_seen": now_iso(),
-                "last_confirmed": now_iso(),
-                "expires_at": it.get("expires_at") or "9999-12-31T00:00:00+00:00",
-                "status": "active",
-                "evidence": it.get("evidence") or [],
-            }
-        )
+        confirmed = {
+            "id": op.id,
+            "fact": fact,
+            "value": value,
+            "domain": it.get("domain", ""),
+            "confidence": 0.99,
+            "first_seen": it.get("first_seen") or now_iso(),
+            "last_seen": now_iso(),
+            "last_confirmed": now_iso(),
+            "expires_at": it.get("expires_at") or "9999-12-31T00:00:00+00:00",
+            "status": "active",
+            "evidence": it.get("evidence") or [],
+        }
+        out["confirmed_facts"].append(confirmed)
+        if sec != "confirmed_facts":
+            idx[op.id] = ("confirmed_facts", confirmed)
+
+
+def _load_batch(path: Path) -> list[argparse.Namespace]:
+    ops = []
+    with path.open("rb") as f:
+        for n, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                entry = loads_json_bytes(line)
+            except json.JSONDecodeError as e:
+                raise SystemExit(f"batch line {n}: invalid JSON: {e}")
+            if not isinstance(entry, dict):
+                raise SystemExit(f"batch line {n}: expected a JSON object")
+            unknown = set(entry) - {"op", *OP_FIELDS}
+            if unknown:
+                raise SystemExit(f"batch line {n}: unknown keys: {', '.join(sorted(unknown))}")
+            if entry.get("op") not in OPS:
+                raise SystemExit(f"batch line {n}: op must be one of: {', '.join(OPS)}")
+            bad = [k for k in OP_FIELDS if not isinstance(entry.get(k), (str, type(None)))]
+            if bad:
+                raise SystemExit(f"batch line {n}: expected a string for: {', '.join(bad)}")
+            ops.append(argparse.Namespace(**{k: entry.get(k) for k in ("op", *OP_FIELDS)}))
+    if not ops:
+        raise SystemExit(f"batch is empty: {path}")
+    return ops
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--model", required=True)
+    ap.add_argument(
+        "--schema",
+        default=str(Path(__file__).resolve().parent.parent / "references" / "model.schema.json"),
+    )
+    mode = ap.add_mutually_exclusive_group(required=True)
+    mode.add_argument("--op", choices=OPS)
+    mode.add_argument("--batch", help="JSON-lines file of ops to apply in order")
+    ap.add_argument("--pattern")
+    ap.add_argument("--domain")
+    ap.add_argument("--note")
+    ap.add_argument("--id")
+    ap.add_argument("--match")
+    ap.add_argument("--fact")
+    ap.add_argument("--value")
+    args = ap.parse_args()
+
+    ops = _load_batch(Path(args.batch)) if args.batch else [args]
+
+    model_path = Path(args.model)
+    model = load_json(model_path, default=None)
+    if not model:
+        raise SystemExit(f"model not found or empty: {model_path}")
+
+    # Mutate in place: nothing is written unless the result validates.
+    out = model
+    out["updatedAt"] = now_iso()
+
+    idx = _build_index(out)
+    for n, op in enumerate(ops, start=1):
+        try:
+            _apply(out, op, idx)
+        except SystemExit as e:
+            if args.batch:
+                raise SystemExit(f"batch op {n} ({op.op}): {e.code}")
+            raise
 
     # Drop retracted from active lists but keep them in stale_items for audit.
     # (Renderer should also hide retracted.)
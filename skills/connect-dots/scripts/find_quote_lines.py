@@ -17,9 +17,13 @@ Exit non-zero if quote not found.
 from __future__ import annotations
 
 import argparse
+import bisect
+import os
 import sys
 from pathlib import Path
 
+from _lib import read_text_with_offsets
+
 
 def main() -> int:
     ap = argparse.ArgumentParser()
@@ -31,10 +35,10 @@ def main() -> int:
 
     ws = Path(args.workspace).resolve()
     p = (ws / args.path).resolve()
-    if not str(p).startswith(str(ws)):
+    if not p.is_relative_to(ws):
         print("error: path escapes workspace", file=sys.stderr)
         return 2
-    if not p.exists():
+    if not os.path.isfile(p):
         print("error: file not found", file=sys.stderr)
         return 2
 
@@ -43,23 +47,16 @@ def main() -> int:
         print("error: empty quote", file=sys.stderr)
         return 2
 
-    with p.open("r", encoding="utf-8", errors="ignore") as f:
-        lines = f.readlines()
-
-    for i, line in enumerate(lines, start=1):
-        if q in line:
-            end = min(len(lines), i + max(1, args.window) - 1)
-            sys.stdout.write(f"L{i}-L{end}\n")
-            return 0
-
-    # fallback: search whole file (multi-line snippets)
-    full = "".join(lines)
-    idx = full.find(q)
+    # Read exactly as verify_evidence_sources does (universal newlines, undecodable bytes dropped)
+    # so the range printed here always passes citation checks. The first hit is always on the first
+    # matching line, so one scan covers both single-line and multi-line quotes.
+    text, offsets = read_text_with_offsets(p)
+    idx = text.find(q)
     if idx >= 0:
-        # map to line
-        upto = full[:idx]
-        line_no = upto.count("\n") + 1
-        end = min(len(lines), line_no + max(1, args.window) - 1)
+        line_no = bisect.bisect_right(offsets, idx)
+        # The range must also reach the quote's last line, or a multi-line quote fails verification.
+        last = bisect.bisect_right(offsets, idx + len(q) - 1)
+        end = max(last, min(len(offsets) - 1, line_no + max(1, args.window) - 1))
         sys.stdout.write(f"L{line_no}-L{end}\n")
         return 0
 
@@ -10,9 +10,10 @@ Usage:
 from __future__ import annotations
 
 import argparse
+import sys
 from pathlib import Path
 
-from _lib import load_json
+from _lib import load_json, run_main
 
 
 def _index(model):
@@ -32,57 +33,67 @@ def _index(model):
     return idx
 
 
-def main() -> int:
-    ap = argparse.ArgumentParser()
-    ap.add_argument("--prev", required=True)
-    ap.add_argument("--cur", required=True)
-    ap.add_argument("--cap", type=int, default=10)
-    args = ap.parse_args()
+def _change_key(it):
+    # One tuple compare per shared id instead of a per-field loop.
+    return (it.get("statement"), it.get("value"), it.get("confidence"), it.get("status"), it.get("expires_at"))
 
-    prev = load_json(Path(args.prev), default={})
-    cur = load_json(Path(args.cur), default={})
 
+def diff_lines(prev, cur, cap: int = 10) -> list[str]:
+    """Bounded changelog lines (+ added, ~ updated, - retracted) between two model dicts."""
     p = _index(prev)
     c = _index(cur)
 
     added, updated, retracted = [], [], []
 
     for cid, (_, it) in c.items():
-        if cid not in p:
+        prev_entry = p.get(cid)
+        if prev_entry is None:
             added.append(f"+ {it.get('statement') or it.get('fact') or cid}")
             continue
-        _, pit = p[cid]
+        pit = prev_entry[1]
         if it.get("status") == "retracted" and pit.get("status") != "retracted":
             retracted.append(f"- {it.get('statement') or it.get('fact') or cid}")
             continue
-        changed = False
-        for k in ("statement", "value", "confidence", "status", "expires_at"):
-            if it.get(k) != pit.get(k):
-                changed = True
-                break
-        if changed:
+        if _change_key(it) != _change_key(pit):
             updated.append(f"~ {it.get('statement') or it.get('fact') or cid}")
 
     # items that disappeared entirely are treated as retracted for audit
-    for pid, (_, pit) in p.items():
-        if pid not in c:
-            retracted.append(f"- {pit.get('statement') or pit.get('fact') or pid}")
+    removed_ids = p.keys() - c.keys()
+    if removed_ids:
+        for pid, (_, pit) in p.items():
+            if pid in removed_ids:
+                retracted.append(f"- {pit.get('statement') or pit.get('fact') or pid}")
 
-    def cap(xs):
-        return xs[: max(0, args.cap)]
+    if not (added or updated or retracted):
+        return ["(no material changes)"]
 
-    for line in cap(added):
-        print(line)
-    for line in cap(updated):
-        print(line)
-    for line in cap(retracted):
-        print(line)
+    n = max(0, cap)
+    return added[:n] + updated[:n] + retracted[:n]
+
+
+def _parse_args(argv: list[str] | None):
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--prev", required=True)
+    ap.add_argument("--cur", required=True)
+    ap.add_argument("--cap", type=int, default=10)
+    return ap.parse_args(argv)
+
+
+def _render(args) -> str:
+    prev = load_json(Path(args.prev), default={})
+    cur = load_json(Path(args.cur), default={})
+    return "".join(f"{line}\n" for line in diff_lines(prev, cur, args.cap))
 
-    if not (added or updated or retracted):
-        print("(no material changes)")
 
+def main(argv: list[str] | None = None) -> int:
+    sys.stdout.write(_render(_parse_args(argv)))
     return 0
 
 
+def run(argv: list[str]) -> tuple[int, str, str]:
+    """In-process entry point for callers that would otherwise spawn this script."""
+    return run_main(main, argv)
+
+
 if __name__ == "__main__":
     raise SystemExit(main())
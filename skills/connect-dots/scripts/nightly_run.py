@@ -17,7 +17,7 @@ Artifacts per scope:
 - pre snapshot:  tmp/connect-dots/runs/<runId>/<scope>/model.pre.json (if exists)
 - post snapshot: tmp/connect-dots/runs/<runId>/<scope>/model.post.json (if applied)
 - diff:          tmp/connect-dots/runs/<runId>/<scope>/diff.txt
-- error log:     tmp/connect-dots/runs/<runId>/<scope>/error.log
+- error log:     tmp/connect-dots/runs/<runId>/<scope>/error.log (only on errors/warnings)
 
 If any schema/citation checks fail: write nothing and log only.
 
@@ -36,13 +36,19 @@ Notes:
 from __future__ import annotations
 
 import argparse
-import json
+import functools
 import os
-import subprocess
-import sys
+import shutil
+from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
 
+import build_model
+import model_diff
+import update_anti_patterns
+import update_lessons
+import write_run_record
+from _lib import dumps_json_bytes, get_validator, loads_json_bytes
 from pending_decisions import PENDING_DECISIONS_PATH, parse_pending_decisions, prepare_candidates_from_proposal
 
 
@@ -54,32 +60,36 @@ def now_iso() -> str:
     return datetime.now(timezone.utc).astimezone().isoformat(timespec="seconds")
 
 
-def sh(cmd: list[str], *, cwd: Path | None = None, timeout: int = 600) -> tuple[int, str, str]:
-    p = subprocess.run(cmd, cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, timeout=timeout)
-    return p.returncode, p.stdout, p.stderr
-
-
 def write_text(path: Path, text: str) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
     path.write_text(text, encoding="utf-8")
 
 
 def load_json(path: Path) -> dict:
-    with path.open("r", encoding="utf-8") as f:
-        return json.load(f)
+    return loads_json_bytes(path.read_bytes())
 
 
 def dump_json(path: Path, obj: dict) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
-    with path.open("w", encoding="utf-8") as f:
-        json.dump(obj, f, ensure_ascii=False, indent=2)
-        f.write("\n")
+    path.write_bytes(dumps_json_bytes(obj))
+
+
+@dataclass
+class ScopeCtx:
+    """Per-scope paths plus the proposal, parsed once and shared by every pipeline step."""
 
+    scope: str
+    scope_dir: Path
+    proposal_path: Path
+    err_path: Path
+    proposal: dict
 
-def emit_pending_decision_candidates(*, ws: Path, scope_dir: Path, proposal_path: Path, err_path: Path, skill_dir: Path) -> None:
+
+def emit_pending_decision_candidates(*, ws: Path, ctx: ScopeCtx, skill_dir: Path) -> None:
     """Output-only bridge from proposal items to reviewable pending-decision candidates."""
+    scope_dir, proposal_path, err_path = ctx.scope_dir, ctx.proposal_path, ctx.err_path
     try:
-        proposal = load_json(proposal_path)
+        proposal = ctx.proposal
         existing = parse_pending_decisions(ws / PENDING_DECISIONS_PATH)
         schema_path = skill_dir / "references" / "pending-decision.schema.json"
         candidates = prepare_candidates_from_proposal(
@@ -116,7 +126,7 @@ def resolve_scope_dir(runs_root: Path, scope: str) -> Path:
 def _read_openclaw_routing() -> dict:
     """Extract a safe routing snapshot from OpenClaw config.
 
-    We only read the non-secret model routing bits.
+    We only read the non-secret model routing bits. Parsed once per (config path, mtime, size, inode).
     """
     cfg_path = os.environ.get("OPENCLAW_CONFIG_PATH")
     if cfg_path:
@@ -124,8 +134,22 @@ def _read_openclaw_routing() -> dict:
     else:
         p = Path.home() / ".openclaw" / "openclaw.json"
 
+    # Same key as the _lib file caches: an atomic replace within one mtime tick still changes inode/size.
+    try:
+        st = p.stat()
+        stamp = (st.st_mtime_ns, st.st_size, st.st_ino)
+    except OSError:
+        stamp = (-1, -1, -1)
+    r = _read_openclaw_routing_cached(str(p), stamp)
+    # Hand out a copy so callers can't mutate the cached snapshot.
+    return {**r, "fallbacks": list(r["fallbacks"])}
+
+
+@functools.lru_cache(maxsize=4)
+def _read_openclaw_routing_cached(path_str: str, stamp: tuple[int, int, int]) -> dict:
+    p = Path(path_str)
     try:
-        cfg = json.loads(p.read_text(encoding="utf-8"))
+        cfg = loads_json_bytes(p.read_bytes())
     except Exception:
         cfg = {}
 
@@ -196,7 +220,7 @@ def _read_connect_dots_nightly_job() -> dict:
         p = Path.home() / ".openclaw" / "cron" / "jobs.json"
 
     try:
-        raw = json.loads(p.read_text(encoding="utf-8"))
+        raw = loads_json_bytes(p.read_bytes())
     except Exception:
         raw = []
 
@@ -250,20 +274,17 @@ def _write_nightly_model_snapshot(*, ws: Path, scope_dir: Path, job: dict) -> Pa
     return snap
 
 
-def _patch_openclaw_runtime_proposal(*, ws: Path, scope_dir: Path, proposal_path: Path) -> None:
+def _patch_openclaw_runtime_proposal(*, ws: Path, ctx: ScopeCtx, routing: dict | None = None) -> None:
     """Ensure high-churn runtime facts are sourced from live config snapshots.
 
     This prevents stale routing/model-pin facts from being re-ingested purely from memory notes.
+    Only called for the openclaw-runtime/ops scope (the caller gates on it).
     """
-    try:
-        proposal = load_json(proposal_path)
-    except Exception:
-        return
-
-    if proposal.get("scope") != "openclaw-runtime/ops":
-        return
+    scope_dir = ctx.scope_dir
+    proposal = ctx.proposal
 
-    routing = _read_openclaw_routing()
+    if routing is None:
+        routing = _read_openclaw_routing()
     snap_path = _write_routing_snapshot(ws=ws, scope_dir=scope_dir, r=routing)
     rel = snap_path.relative_to(ws).as_posix()
 
@@ -379,7 +400,122 @@ def _patch_openclaw_runtime_proposal(*, ws: Path, scope_dir: Path, proposal_path
     items["confirmed_facts"] = facts
     proposal["items"] = items
 
-    dump_json(proposal_path, proposal)
+    # build_model and write_run_record read the proposal from disk; keep it in sync.
+    dump_json(ctx.proposal_path, proposal)
+
+
+def _process_scope(
+    scope: str,
+    *,
+    ws: Path,
+    runs_root: Path,
+    model_root: Path,
+    skill_dir: Path,
+    prop_schema: Path,
+    phase: int,
+    apply_allowed: bool,
+    routing: dict | None,
+) -> str:
+    """Run validate -> build (dry-run) -> diff -> optional apply for one scope; returns its run status."""
+    scope_dir = resolve_scope_dir(runs_root, scope)
+    proposal_path = scope_dir / "proposal.json"
+    pre_path = scope_dir / "model.pre.json"
+    post_path = scope_dir / "model.post.json"
+    diff_path = scope_dir / "diff.txt"
+    err_path = scope_dir / "error.log"
+
+    # The error log is only written when there is something to report; drop one left by an earlier
+    # attempt under the same runId so write_run_record doesn't classify this run by stale errors.
+    err_path.unlink(missing_ok=True)
+
+    # The agent must create proposal.json; if missing, fail closed for this scope.
+    if not proposal_path.exists():
+        write_text(err_path, f"ERROR: proposal.json missing for scope {scope}\n")
+        return "failed"
+
+    # Parse once; every step below shares this dict.
+    try:
+        proposal = load_json(proposal_path)
+    except Exception as e:
+        write_text(err_path, f"ERROR: proposal schema invalid\n{type(e).__name__}: {e}\n")
+        return "failed"
+    ctx = ScopeCtx(scope=scope, scope_dir=scope_dir, proposal_path=proposal_path, err_path=err_path, proposal=proposal)
+
+    # Patch high-churn runtime facts (must happen before schema validation + build_model evidence checks).
+    if scope == "openclaw-runtime/ops":
+        _patch_openclaw_runtime_proposal(ws=ws, ctx=ctx, routing=routing)
+
+    emit_pending_decision_candidates(ws=ws, ctx=ctx, skill_dir=skill_dir)
+
+    # Validate proposal schema (fail closed); in-process against the cached compiled validator.
+    err = get_validator(prop_schema)(ctx.proposal)
+    if err is not None:
+        write_text(err_path, f"ERROR: proposal schema invalid\n{err}\n")
+        return "failed"
+
+    # Copy pre-model if exists
+    model_path = model_root / scope / "model.json"
+    if model_path.exists():
+        pre_path.parent.mkdir(parents=True, exist_ok=True)
+        # Byte-identical copy; copyfile stays in-kernel (sendfile) where available.
+        shutil.copyfile(model_path, pre_path)
+
+    # Always compute diff in phase 1 by simulating apply into a temp file.
+    # Seed it with the live model so the simulation merges exactly what apply would.
+    tmp_model = scope_dir / "model.tmp.json"
+    if model_path.exists():
+        shutil.copyfile(pre_path, tmp_model)
+    elif tmp_model.exists():
+        tmp_model.unlink()
+
+    # Build into tmp_model (fail closed if citations invalid)
+    code, out, err = build_model.run(
+        [
+            "--scope",
+            scope,
+            "--workspace",
+            str(ws),
+            "--model",
+            str(tmp_model),
+            "--proposal",
+            str(proposal_path),
+        ],
+        proposal=ctx.proposal,
+    )
+    if code != 0:
+        write_text(err_path, f"ERROR: build_model failed (dry-run)\n{err}\n")
+        return "failed"
+
+    # Diff: prev vs tmp_model
+    if pre_path.exists():
+        code, d_out, d_err = model_diff.run(["--prev", str(pre_path), "--cur", str(tmp_model)])
+        if code != 0:
+            write_text(err_path, f"ERROR: model_diff failed\n{d_err}\n")
+            return "failed"
+        write_text(diff_path, d_out)
+    else:
+        write_text(diff_path, "+ added initial snapshot\n")
+
+    if phase == 1 or not apply_allowed:
+        # No writes to model.json
+        return "success"
+
+    # Phase 2 apply: promote the validated tmp_model. build_model only writes after schema + citation
+    # checks pass, so it needs no second build. scope_dir and model_root may sit on different
+    # filesystems, so stage the bytes next to model.json and os.replace from there to keep the swap atomic.
+    staged = model_path.with_name(model_path.name + ".apply.tmp")
+    try:
+        shutil.copyfile(tmp_model, post_path)
+        model_path.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(tmp_model, staged)
+        os.replace(staged, model_path)
+        tmp_model.unlink()
+    except OSError as e:
+        staged.unlink(missing_ok=True)
+        write_text(err_path, f"ERROR: apply failed\n{e}\n")
+        return "failed"
+
+    return "success"
 
 
 def main() -> int:
@@ -412,154 +548,37 @@ def main() -> int:
     # Phase gate: if memory/internal/connect-dots/.disabled exists, we still do dry-run artifacts.
     disabled_flag = model_root / ".disabled"
 
-    # For each scope, expect the LLM to have already written a proposal to a known location OR
-    # the agentTurn message should instruct it to do so.
-    ok_any = True
-    scope_statuses: list[tuple[str, str]] = []
-
-    for scope in scopes:
-        scope_dir = resolve_scope_dir(runs_root, scope)
-        proposal_path = scope_dir / "proposal.json"
-        pre_path = scope_dir / "model.pre.json"
-        post_path = scope_dir / "model.post.json"
-        diff_path = scope_dir / "diff.txt"
-        err_path = scope_dir / "error.log"
-
-        # Always create an error log file (empty on success).
-        write_text(err_path, "")
-
-        # The agent must create proposal.json; if missing, fail closed for this scope.
-        if not proposal_path.exists():
-            write_text(err_path, f"ERROR: proposal.json missing for scope {scope}\n")
-            scope_statuses.append((scope, "failed"))
-            ok_any = False
-            continue
+    prop_schema = skill_dir / "references" / "proposal.schema.json"
+
+    # If storage disabled, we still simulate apply/diff; apply is a no-op.
+    apply_allowed = (phase == 2) and (not disabled_flag.exists())
 
-        # Patch high-churn runtime facts (must happen before schema validation + build_model evidence checks).
-        if scope == "openclaw-runtime/ops":
-            _patch_openclaw_runtime_proposal(ws=ws, scope_dir=scope_dir, proposal_path=proposal_path)
+    # Shared, read-only config: read once here rather than per scope.
+    routing = _read_openclaw_routing() if "openclaw-runtime/ops" in scopes else None
 
-        emit_pending_decision_candidates(
+    # For each scope, expect the LLM to have already written a proposal to a known location OR
+    # the agentTurn message should instruct it to do so.
+    # Scopes run one after another: the in-process build/diff work is CPU-bound Python (threads would
+    # only contend for the GIL), and the helpers share process-wide caches and capture output
+    # through process-global redirects.
+    statuses = [
+        _process_scope(
+            scope,
             ws=ws,
-            scope_dir=scope_dir,
-            proposal_path=proposal_path,
-            err_path=err_path,
+            runs_root=runs_root,
+            model_root=model_root,
             skill_dir=skill_dir,
+            prop_schema=prop_schema,
+            phase=phase,
+            apply_allowed=apply_allowed,
+            routing=routing,
         )
+        for scope in scopes
+    ]
+    scope_statuses = list(zip(scopes, statuses))
+    ok_any = all(status == "success" for status in statuses)
 
-        # Validate proposal schema (fail closed)
-        prop_schema = skill_dir / "references" / "proposal.schema.json"
-        code, out, err = sh(
-            [
-                sys.executable,
-                "-c",
-                "import json, jsonschema, sys; jsonschema.validate(json.load(open(sys.argv[1])), json.load(open(sys.argv[2]))); print('OK')",
-                str(proposal_path),
-                str(prop_schema),
-            ],
-            cwd=ws,
-            timeout=60,
-        )
-        if code != 0:
-            write_text(err_path, f"ERROR: proposal schema invalid\n{err}\n")
-            scope_statuses.append((scope, "failed"))
-            ok_any = False
-            continue
-
-        # Copy pre-model if exists
-        model_path = model_root / scope / "model.json"
-        if model_path.exists():
-            pre_path.parent.mkdir(parents=True, exist_ok=True)
-            pre_path.write_text(model_path.read_text(encoding="utf-8"), encoding="utf-8")
-
-        # Always compute diff in phase 1 by simulating apply into a temp file.
-        tmp_model = scope_dir / "model.tmp.json"
-
-        # If storage disabled, we still simulate apply/diff; apply is a no-op.
-        apply_allowed = (phase == 2) and (not disabled_flag.exists())
-
-        # Build into tmp_model (fail closed if citations invalid)
-        code, out, err = sh(
-            [
-                sys.executable,
-                str(scripts_dir / "build_model.py"),
-                "--scope",
-                scope,
-                "--workspace",
-                str(ws),
-                "--model",
-                str(tmp_model),
-                "--proposal",
-                str(proposal_path),
-            ],
-            cwd=ws,
-            timeout=600,
-        )
-        if code != 0:
-            write_text(err_path, f"ERROR: build_model failed (dry-run)\n{err}\n")
-            scope_statuses.append((scope, "failed"))
-            ok_any = False
-            continue
-
-        # Diff: prev vs tmp_model
-        if pre_path.exists():
-            code, d_out, d_err = sh(
-                [
-                    sys.executable,
-                    str(scripts_dir / "model_diff.py"),
-                    "--prev",
-                    str(pre_path),
-                    "--cur",
-                    str(tmp_model),
-                ],
-                cwd=ws,
-                timeout=60,
-            )
-            if code != 0:
-                write_text(err_path, f"ERROR: model_diff failed\n{d_err}\n")
-                scope_statuses.append((scope, "failed"))
-                ok_any = False
-                continue
-            write_text(diff_path, d_out)
-        else:
-            write_text(diff_path, "+ added initial snapshot\n")
-
-        if phase == 1 or not apply_allowed:
-            # No writes to model.json
-            scope_statuses.append((scope, "success"))
-            continue
-
-        # Phase 2 apply: write tmp_model -> model.json atomically by calling build_model again against real path.
-        # (We re-run build_model to avoid copying an unvalidated file; it re-validates citations.)
-        code, out, err = sh(
-            [
-                sys.executable,
-                str(scripts_dir / "build_model.py"),
-                "--scope",
-                scope,
-                "--workspace",
-                str(ws),
-                "--model",
-                str(model_path),
-                "--proposal",
-                str(proposal_path),
-                "--snapshot-out",
-                str(post_path),
-            ],
-            cwd=ws,
-            timeout=600,
-        )
-        if code != 0:
-            write_text(err_path, f"ERROR: build_model failed (apply)\n{err}\n")
-            scope_statuses.append((scope, "failed"))
-            ok_any = False
-            continue
-
-        scope_statuses.append((scope, "success"))
-
-    run_record_cmd = [
-        sys.executable,
-        str(scripts_dir / "write_run_record.py"),
+    run_record_args = [
         "--workspace",
         str(ws),
         "--run-id",
@@ -578,9 +597,9 @@ def main() -> int:
         str(model_root / "insights" / "feedback.json"),
     ]
     for scope_name, scope_status in scope_statuses:
-        run_record_cmd.extend(["--scope", f"{scope_name}:{scope_status}"])
+        run_record_args.extend(["--scope", f"{scope_name}:{scope_status}"])
 
-    code, out, err = sh(run_record_cmd, cwd=ws, timeout=60)
+    code, out, err = write_run_record.run(run_record_args)
     if code != 0:
         write_text(runs_root / "run.error.log", f"ERROR: write_run_record failed\n{err}\n")
         ok_any = False
@@ -588,28 +607,24 @@ def main() -> int:
         run_json = runs_root / "run.json"
         insights_root = model_root / "insights"
         if not disabled_flag.exists():
-            lessons_cmd = [
-                sys.executable,
-                str(scripts_dir / "update_lessons.py"),
+            lessons_args = [
                 "--run",
                 str(run_json),
                 "--store",
                 str(insights_root / "lessons.json"),
             ]
-            code, out, err = sh(lessons_cmd, cwd=ws, timeout=60)
+            code, out, err = update_lessons.run(lessons_args)
             if code != 0:
                 write_text(runs_root / "lessons.error.log", f"ERROR: update_lessons failed\n{err}\n")
                 ok_any = False
 
-            anti_patterns_cmd = [
-                sys.executable,
-                str(scripts_dir / "update_anti_patterns.py"),
+            anti_patterns_args = [
                 "--run",
                 str(run_json),
                 "--store",
                 str(insights_root / "anti-patterns.json"),
             ]
-            code, out, err = sh(anti_patterns_cmd, cwd=ws, timeout=60)
+            code, out, err = update_anti_patterns.run(anti_patterns_args)
             if code != 0:
                 write_text(runs_root / "anti-patterns.error.log", f"ERROR: update_anti_patterns failed\n{err}\n")
                 ok_any = False
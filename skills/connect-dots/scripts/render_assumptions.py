@@ -7,6 +7,8 @@ It expects the model JSON to already contain evidence with line refs.
 Usage:
   python3 render_assumptions.py --model path/to/model.json [--prev path/to/prev.json]
 
+Pass `--model -` to read the model from stdin.
+
 Exit codes:
   0 ok
   2 bad input
@@ -15,21 +17,25 @@ Exit codes:
 from __future__ import annotations
 
 import argparse
+import functools
+import heapq
 import json
 import sys
 from datetime import datetime, timezone
 
 from policy_guard import enforce_policy
 
+try:  # optional: C-backed JSON codec
+    import orjson
+except ImportError:  # pragma: no cover - stdlib-only environments
+    orjson = None
+
 
 def _now_dt() -> datetime:
     return datetime.now(timezone.utc).astimezone()
 
 
-def _now_iso() -> str:
-    return _now_dt().isoformat(timespec="seconds")
-
-
+@functools.lru_cache(maxsize=1024)
 def _parse_iso(ts: str) -> datetime | None:
     if not ts:
         return None
@@ -40,6 +46,9 @@ def _parse_iso(ts: str) -> datetime | None:
 
 
 def _recency_days(ts: str, now: datetime) -> int | None:
+    # _parse_iso is lru_cached, so a malformed non-string ts would raise TypeError instead of reading as undated.
+    if not isinstance(ts, str):
+        return None
     dt = _parse_iso(ts)
     if not dt:
         return None
@@ -50,6 +59,12 @@ def _recency_days(ts: str, now: datetime) -> int | None:
 
 
 def _load(path: str):
+    if path == "-":
+        data = sys.stdin.read()
+        return orjson.loads(data) if orjson is not None else json.loads(data)
+    if orjson is not None:
+        with open(path, "rb") as f:
+            return orjson.loads(f.read())
     with open(path, "r", encoding="utf-8") as f:
         return json.load(f)
 
@@ -75,8 +90,8 @@ def _fmt_evidence(item, now: datetime) -> str:
     return f"Source: {path}#{lines}{rec}"
 
 
-def _cap(items, n):
-    return list(items)[:n]
+def _fmt_conf(conf) -> str:
+    return f"{int(round(conf*100))}%" if conf <= 1 else f"{conf}%"
 
 
 def _diff(prev, cur):
@@ -87,86 +102,57 @@ def _diff(prev, cur):
     if not prev:
         return ["+ added initial snapshot"], [], []
 
-    def index(model):
-        idx = {}
+    def items(model):
         for section in ("confirmed_facts", "hypotheses", "stale_items"):
             for it in _safe_list(model.get(section)):
                 if isinstance(it, dict) and it.get("id"):
-                    idx[it["id"]] = (section, it)
-        return idx
+                    yield it
 
-    p = index(prev)
-    c = index(cur)
+    # Later duplicates of an id win, as with a dict index.
+    p = {it["id"]: it for it in items(prev)}
+    c = {it["id"]: it for it in items(cur)}
 
+    # Only 5 bullets per bucket are ever shown, so stop scanning once both caps fill.
     added, updated, retracted = [], [], []
-    for cid, (csec, cit) in c.items():
-        if cid not in p:
-            added.append(f"+ {(cit.get('statement') or cit.get('fact') or '(no statement)')}")
+    for cid, cit in c.items():
+        if len(added) >= 5 and len(updated) >= 5:
+            break
+        pit = p.get(cid)
+        if pit is None:
+            if len(added) < 5:
+                added.append(f"+ {(cit.get('statement') or cit.get('fact') or '(no statement)')}")
             continue
-        _, pit = p[cid]
-        changed = False
-        for k in ("statement", "confidence", "status", "expires_at"):
-            if cit.get(k) != pit.get(k):
-                changed = True
-                break
-        if changed:
+        if len(updated) < 5 and (
+            (cit.get("statement"), cit.get("confidence"), cit.get("status"), cit.get("expires_at"))
+            != (pit.get("statement"), pit.get("confidence"), pit.get("status"), pit.get("expires_at"))
+        ):
             updated.append(f"~ {(cit.get('statement') or cit.get('fact') or '(no statement)')}")
 
-    for pid, (_, pit) in p.items():
+    for pid, pit in p.items():
+        if len(retracted) >= 5:
+            break
         if pid not in c:
             retracted.append(f"- {(pit.get('statement') or pit.get('fact') or '(no statement)')}")
 
-    return _cap(added, 5), _cap(updated, 5), _cap(retracted, 5)
+    return added, updated, retracted
 
 
-def main():
-    ap = argparse.ArgumentParser()
-    ap.add_argument("--model", required=True)
-    ap.add_argument("--prev")
-    ap.add_argument("--approved", action="store_true")
-    ap.add_argument("--external", action="store_true")
-    ap.add_argument("--service-change", action="store_true")
-    args = ap.parse_args()
-
-    try:
-        model = _load(args.model)
-        prev = _load(args.prev) if args.prev else None
-    except Exception as e:
-        print(f"error: failed to load json: {e}", file=sys.stderr)
-        return 2
-
+def render(model: dict, prev: dict | None = None, now: datetime | None = None) -> str:
+    """Format the snapshot text for `model` (diffed against `prev`); no policy check, no I/O."""
+    now = now or _now_dt()
     scope = model.get("scope", "(unknown)")
-    decision = enforce_policy(
-        scope=scope,
-        action_kind="surface-brief",
-        user_facing=True,
-        external=bool(args.external),
-        service_change=bool(args.service_change),
-        approved=bool(args.approved),
-    )
-    if not decision.get("allowed"):
-        print(
-            f"REFUSED: lane={decision.get('lane')} blast_radius={decision.get('blast_radius')} reason={decision.get('reason')}",
-            file=sys.stderr,
-        )
-        return 2
-
-    now = _now_dt()
     gen = now.isoformat(timespec="seconds")
 
     confirmed = [x for x in _safe_list(model.get("confirmed_facts")) if isinstance(x, dict) and x.get("status") != "retracted"]
     hyps = [x for x in _safe_list(model.get("hypotheses")) if isinstance(x, dict) and x.get("status") != "retracted"]
     stale = [x for x in _safe_list(model.get("stale_items")) if isinstance(x, dict) and x.get("status") != "retracted"]
 
-    confirmed = sorted(confirmed, key=lambda x: x.get("last_seen", ""), reverse=True)
-    hyps = sorted(hyps, key=lambda x: x.get("confidence", 0), reverse=True)
-    stale = sorted(stale, key=lambda x: x.get("last_seen", ""), reverse=True)
+    # nlargest == sorted(..., reverse=True)[:n] (ties keep input order) without sorting everything.
+    confirmed = heapq.nlargest(5, confirmed, key=lambda x: x.get("last_seen", ""))
+    hyps = heapq.nlargest(5, hyps, key=lambda x: x.get("confidence", 0))
+    stale = heapq.nlargest(3, stale, key=lambda x: x.get("last_seen", ""))
     dns = _safe_list(model.get("do_not_store"))
 
-    confirmed = _cap(confirmed, 5)
-    hyps = _cap(hyps, 5)
-    stale = _cap(stale, 3)
-
     added, updated, retracted = _diff(prev, model)
 
     lines = []
@@ -176,53 +162,75 @@ def main():
     # 1) Confirmed
     lines.append("\n1) Confirmed facts (max 5)")
     if confirmed:
-        for it in confirmed:
-            fact = it.get("fact") or it.get("statement") or "(fact)"
-            val = it.get("value")
-            last_conf = it.get("last_confirmed") or it.get("last_seen") or "?"
-            v = f"{val}" if val is not None else ""
-            src = _fmt_evidence(it, now)
-            lines.append(f"- {fact} · {v} · last confirmed: {last_conf} · {src}")
+        rows = [
+            (
+                it.get("fact") or it.get("statement") or "(fact)",
+                it.get("value"),
+                it.get("last_confirmed") or it.get("last_seen") or "?",
+                _fmt_evidence(it, now),
+            )
+            for it in confirmed
+        ]
+        lines.extend(
+            f"- {fact} · {'' if val is None else val} · last confirmed: {last_conf} · {src}"
+            for fact, val, last_conf, src in rows
+        )
     else:
         lines.append("- (none)")
 
     # 2) Hypotheses
     lines.append("\n2) Top hypotheses (max 5)")
     if hyps:
-        for it in hyps:
-            stmt = it.get("statement", "(no statement)")
-            conf = it.get("confidence", 0)
-            why = it.get("why", "")
-            confirm = it.get("confirm", "")
-            expires = it.get("expires_at", "?")
-            src = _fmt_evidence(it, now)
-            why_part = f" · why: {why}" if why else ""
-            conf_part = f"{int(round(conf*100))}%" if conf <= 1 else f"{conf}%"
-            confirm_part = f" · confirm/deny: {confirm}" if confirm else ""
-            lines.append(f"- {stmt} · confidence: {conf_part}{why_part}{confirm_part} · expires: {expires} · {src}")
+        rows = [
+            (
+                it.get("statement", "(no statement)"),
+                it.get("confidence", 0),
+                it.get("why", ""),
+                it.get("confirm", ""),
+                it.get("expires_at", "?"),
+                _fmt_evidence(it, now),
+            )
+            for it in hyps
+        ]
+        lines.extend(
+            f"- {stmt} · confidence: {_fmt_conf(conf)}"
+            f"{f' · why: {why}' if why else ''}"
+            f"{f' · confirm/deny: {confirm}' if confirm else ''}"
+            f" · expires: {expires} · {src}"
+            for stmt, conf, why, confirm, expires, src in rows
+        )
     else:
         lines.append("- (none)")
 
     # 3) Stale
     lines.append("\n3) Stale assumptions (max 3)")
     if stale:
-        for it in stale:
-            stmt = it.get("statement", "(no statement)")
-            stale_why = it.get("stale_why", "expired/old evidence")
-            action = it.get("proposed_action", "refresh/drop")
-            src = _fmt_evidence(it, now)
-            lines.append(f"- {stmt} · why stale: {stale_why} · action: {action} · {src}")
+        rows = [
+            (
+                it.get("statement", "(no statement)"),
+                it.get("stale_why", "expired/old evidence"),
+                it.get("proposed_action", "refresh/drop"),
+                _fmt_evidence(it, now),
+            )
+            for it in stale
+        ]
+        lines.extend(
+            f"- {stmt} · why stale: {stale_why} · action: {action} · {src}"
+            for stmt, stale_why, action, src in rows
+        )
     else:
         lines.append("- (none)")
 
     # 4) DNS
     lines.append("\n4) Do-not-store protections (active)")
     if dns:
-        for it in _cap(dns, 10):
+        for it in dns[:10]:
             if isinstance(it, str):
                 lines.append(f"- {it}")
             elif isinstance(it, dict):
-                lines.append(f"- {it.get('pattern') or it.get('value') or json.dumps(it)}")
+                # json.dumps only runs for entries with neither pattern nor value.
+                label = it.get("pattern") or it.get("value")
+                lines.append(f"- {label or json.dumps(it)}")
     else:
         lines.append("- (none)")
 
@@ -244,7 +252,42 @@ def main():
     lines.append("\n6) Control shortcuts")
     lines.append("- forget <x> · don’t store <x> · confirm <x> · deny <x>")
 
-    sys.stdout.write("\n".join(lines).rstrip() + "\n")
+    return "\n".join(lines).rstrip() + "\n"
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--model", required=True)
+    ap.add_argument("--prev")
+    ap.add_argument("--approved", action="store_true")
+    ap.add_argument("--external", action="store_true")
+    ap.add_argument("--service-change", action="store_true")
+    args = ap.parse_args()
+
+    try:
+        model = _load(args.model)
+        prev = _load(args.prev) if args.prev else None
+    except Exception as e:
+        print(f"error: failed to load json: {e}", file=sys.stderr)
+        return 2
+
+    scope = model.get("scope", "(unknown)")
+    decision = enforce_policy(
+        scope=scope,
+        action_kind="surface-brief",
+        user_facing=True,
+        external=bool(args.external),
+        service_change=bool(args.service_change),
+        approved=bool(args.approved),
+    )
+    if not decision.get("allowed"):
+        print(
+            f"REFUSED: lane={decision.get('lane')} blast_radius={decision.get('blast_radius')} reason={decision.get('reason')}",
+            file=sys.stderr,
+        )
+        return 2
+
+    sys.stdout.write(render(model, prev))
     return 0
 
 
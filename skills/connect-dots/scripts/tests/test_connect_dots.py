@@ -1,33 +1,198 @@
+import compileall
+import copy
+import importlib
+import io
 import json
+import math
 import os
+import shutil
 import subprocess
 import sys
 import tempfile
 import unittest
 from datetime import datetime, timezone
 from pathlib import Path
+from unittest import mock
 
 SCRIPTS = Path(__file__).resolve().parents[1]
 REFS = SCRIPTS.parent / "references"
+PY = sys.executable
 sys.path.insert(0, str(SCRIPTS))
 
-from _lib import compute_recency_days, parse_iso
-
-
-def run(cmd, cwd=None):
-    p = subprocess.run(cmd, cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-    return p.returncode, p.stdout, p.stderr
+from _lib import (
+    clone_json,
+    compute_recency_days,
+    confidence_batch,
+    confidence_formula,
+    get_validator,
+    loads_json_bytes,
+    parse_iso,
+    read_text_with_offsets,
+    run_main,
+    validate_or_die,
+    verify_evidence_sources,
+)
+from model_diff import diff_lines, run as model_diff_run
+from nightly_run import _read_openclaw_routing
+from render_assumptions import render as render_assumptions
+
+try:  # optional: C-backed JSON codec for fixtures
+    import orjson
+except ImportError:  # pragma: no cover - stdlib-only environments
+    orjson = None
+
+
+def _dumps(obj):
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode("utf-8")
+
+
+def _loads(buf):
+    if orjson is not None:
+        return orjson.loads(buf)
+    return json.loads(buf)
+
+
+# Fixture workspaces are small and throwaway; keep them in RAM when a writable tmpfs is available.
+TMP_DIR = "/dev/shm" if os.path.isdir("/dev/shm") and os.access("/dev/shm", os.W_OK) else None
+
+# Set CONNECT_DOTS_TEST_SUBPROCESS=1 to run every script in a fresh interpreter (parity check for _call).
+SUBPROCESS = os.environ.get("CONNECT_DOTS_TEST_SUBPROCESS") == "1"
+# Spawned interpreters read the bytecode compiled in setUpModule but never write their own.
+SUBPROCESS_ENV = {"PYTHONDONTWRITEBYTECODE": "1", "PYTHONHASHSEED": "0"}
+
+
+def _call(script_stem, argv, cwd=None, input=None):
+    """Run a script's main() in this process via _lib.run_main and return (exit code, stdout, stderr)."""
+    mod = importlib.import_module(script_stem)
+    saved_argv, saved_cwd, saved_stdin = sys.argv, os.getcwd(), sys.stdin
+    sys.argv = [str(SCRIPTS / f"{script_stem}.py"), *argv]
+    sys.stdin = io.StringIO(input or "")
+    try:
+        if cwd is not None:
+            os.chdir(cwd)
+        # Scripts parse sys.argv themselves; run_main supplies the exit-code and output capture.
+        return run_main(lambda _: mod.main(), argv)
+    finally:
+        sys.argv, sys.stdin = saved_argv, saved_stdin
+        os.chdir(saved_cwd)
+
+
+def run(cmd, cwd=None, input=None, *, capture=True):
+    """`input` is fed to the script's stdin, for `-` path arguments.
+
+    capture=False discards stdout (returned as "") for tests that only check the exit code and files;
+    stderr is always kept for failure messages.
+    """
+    if not SUBPROCESS and len(cmd) >= 2 and cmd[1].endswith(".py"):
+        code, out, err = _call(Path(cmd[1]).stem, cmd[2:], cwd=cwd, input=input)
+        return code, out if capture else "", err
+    stdout = subprocess.PIPE if capture else subprocess.DEVNULL
+    p = subprocess.run(cmd, cwd=cwd, env={**os.environ, **SUBPROCESS_ENV}, input=input or "", stdout=stdout, stderr=subprocess.PIPE, text=True)
+    return p.returncode, p.stdout or "", p.stderr
+
+
+def setUpModule():
+    if SUBPROCESS:
+        compileall.compile_dir(str(SCRIPTS), maxlevels=0, quiet=1)
+
+
+# Fixture templates built once at import; tests get fresh copies via _model()/_hypothesis()/_proposal().
+_BASE_MODEL = {
+    "scope": "user-profile/preferences",
+    "updatedAt": "now",
+    "meta": {},
+    "confirmed_facts": [],
+    "hypotheses": [],
+    "stale_items": [],
+    "open_loops": [],
+    "candidate_moves": [],
+    "do_not_store": [],
+}
+_H1_HYPOTHESIS = {
+    "id": "h1",
+    "statement": "JD prefers concise communication.",
+    "confidence": 0.8,
+    "first_seen": "t",
+    "last_seen": "t",
+    "expires_at": "2099-01-01T00:00:00+00:00",
+    "status": "active",
+    "evidence": [{"path": "memory/2026-02-22.md", "lines": "L1-L2", "quote": "a"}],
+}
+_BASE_PROPOSAL = {
+    "scope": "user-profile/preferences",
+    "generatedAt": "2026-02-22T00:00:00+01:00",
+    "items": {
+        "confirmed_facts": [],
+        "hypotheses": [],
+        "open_loops": [],
+        "candidate_moves": [],
+    },
+}
+
+
+def _model(**sections):
+    """Minimal valid model; keyword args replace whole top-level sections."""
+    model = copy.deepcopy(_BASE_MODEL)
+    model.update(sections)
+    return model
+
+
+def _hypothesis(**fields):
+    """Active, unexpired hypothesis `h1` citing the memory fixture; keyword args override fields."""
+    hyp = copy.deepcopy(_H1_HYPOTHESIS)
+    hyp.update(fields)
+    return hyp
+
+
+# consent_mutations single-op cases: (name, seeded model sections, CLI args, projection of the written model, expected).
+CONSENT_CASES = [
+    (
+        "dont-store adds rule",
+        {},
+        ["--op", "dont-store", "--pattern", "foo"],
+        lambda m: [r["pattern"] for r in m["do_not_store"]],
+        ["foo"],
+    ),
+    (
+        # hypotheses list drops retracted
+        "forget retracts by id",
+        {"hypotheses": [_hypothesis(statement="A hypothesis", confidence=0.9)]},
+        ["--op", "forget", "--id", "h1"],
+        lambda m: m["hypotheses"],
+        [],
+    ),
+    (
+        "confirm promotes hypothesis to fact",
+        {"hypotheses": [_hypothesis()]},
+        ["--op", "confirm", "--id", "h1", "--fact", "Communication style", "--value", "concise"],
+        lambda m: (m["hypotheses"], [(f["id"], f["fact"], f["value"]) for f in m["confirmed_facts"]]),
+        ([], [("h1", "Communication style", "concise")]),
+    ),
+]
 
 
 class ConnectDotsDeterministicCoreTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # Template workspace built once and copied per test. Files are copied rather than hardlinked
+        # because some tests rewrite memory/2026-02-22.md in place.
+        cls._tpl = tempfile.TemporaryDirectory(dir=TMP_DIR)
+        tpl = Path(cls._tpl.name)
+        (tpl / "memory").mkdir()
+        # Create a fake memory file to satisfy evidence verification; line 1 matches the hypothesis
+        # statement for quote-in-range verification.
+        (tpl / "memory" / "2026-02-22.md").write_text("JD prefers concise communication.\na\nb\nc\nd\ne\n", encoding="utf-8")
+
+    @classmethod
+    def tearDownClass(cls):
+        cls._tpl.cleanup()
+
     def setUp(self):
-        self.tmp = tempfile.TemporaryDirectory()
+        self.tmp = tempfile.TemporaryDirectory(dir=TMP_DIR)
         self.root = Path(self.tmp.name)
-        (self.root / "memory").mkdir()
-        # Create a fake memory file to satisfy evidence verification.
-        (self.root / "memory" / "2026-02-22.md").write_text("a\nb\nc\nd\ne\n", encoding="utf-8")
-        # Include a line that matches the hypothesis statement for quote-in-range verification.
-        (self.root / "memory" / "2026-02-22.md").write_text("JD prefers concise communication.\n" + (self.root / "memory" / "2026-02-22.md").read_text(encoding="utf-8"), encoding="utf-8")
+        shutil.copytree(self._tpl.name, self.root, dirs_exist_ok=True)
 
         self.model_path = self.root / "model.json"
         self.proposal_path = self.root / "proposal.json"
@@ -36,22 +201,15 @@ class ConnectDotsDeterministicCoreTests(unittest.TestCase):
         self.tmp.cleanup()
 
     def _proposal(self, scope="user-profile/preferences"):
-        return {
-            "scope": scope,
-            "generatedAt": "2026-02-22T00:00:00+01:00",
-            "items": {
-                "confirmed_facts": [],
-                "hypotheses": [],
-                "open_loops": [],
-                "candidate_moves": [],
-            },
-        }
+        prop = copy.deepcopy(_BASE_PROPOSAL)
+        prop["scope"] = scope
+        return prop
 
     def test_validate_model_schema_rejects_missing_fields(self):
         bad = {"scope": "user-profile/preferences"}
-        self.model_path.write_text(json.dumps(bad), encoding="utf-8")
-        code, out, err = run(["python3", str(SCRIPTS / "validate_model.py"), "--model", str(self.model_path)])
+        code, _, err = run([PY, str(SCRIPTS / "validate_model.py"), "--model", "-"], input=json.dumps(bad), capture=False)
         self.assertNotEqual(code, 0)
+        self.assertIn("invalid model (<stdin>)", err)
 
     def test_build_model_creates_skeleton_and_validates_proposal(self):
         prop = self._proposal()
@@ -64,10 +222,9 @@ class ConnectDotsDeterministicCoreTests(unittest.TestCase):
                 ],
             }
         )
-        self.proposal_path.write_text(json.dumps(prop), encoding="utf-8")
-        code, out, err = run(
+        code, _, err = run(
             [
-                "python3",
+                PY,
                 str(SCRIPTS / "build_model.py"),
                 "--scope",
                 "user-profile/preferences",
@@ -76,11 +233,13 @@ class ConnectDotsDeterministicCoreTests(unittest.TestCase):
                 "--model",
                 str(self.model_path),
                 "--proposal",
-                str(self.proposal_path),
-            ]
+                "-",
+            ],
+            input=json.dumps(prop),
+            capture=False,
         )
         self.assertEqual(code, 0, msg=err)
-        model = json.loads(self.model_path.read_text(encoding="utf-8"))
+        model = _loads(self.model_path.read_bytes())
         self.assertEqual(model["scope"], "user-profile/preferences")
         self.assertEqual(len(model["hypotheses"]), 1)
         self.assertIn("expires_at", model["hypotheses"][0])
@@ -105,6 +264,103 @@ class ConnectDotsDeterministicCoreTests(unittest.TestCase):
         self.assertGreaterEqual(rec_days, 0.0)
         self.assertLess(rec_days, 2.0)
 
+    def test_json_helpers_keep_stdlib_results_where_orjson_differs(self):
+        data = {"big": 2**70, "nested": [{"x": 1}]}
+        cloned = clone_json(data)
+        self.assertEqual(cloned, data)
+        self.assertIsNot(cloned["nested"][0], data["nested"][0])
+        loaded = loads_json_bytes(b'{"x": NaN, "y": Infinity}')
+        self.assertTrue(math.isnan(loaded["x"]))
+        self.assertEqual(loaded["y"], float("inf"))
+        with self.assertRaises(ValueError):
+            loads_json_bytes(b"{not json")
+
+    def test_confidence_batch_matches_scalar_formula(self):
+        now = datetime(2026, 3, 10, 0, 0, 0, tzinfo=timezone.utc)
+        rows = [
+            ([], False, False),
+            ([{"ts": "2026-03-09T20:00:00Z"}], True, False),
+            ([{"ts": "2026-03-08"}, {"ts": "2026-03-01T00:00:00+01:00"}, {"path": "x"}], False, True),
+        ]
+        expected = [confidence_formula(evidence=ev, user_confirmed=uc, conflicts=cf, now=now) for ev, uc, cf in rows]
+        for got, want in zip(confidence_batch(rows, now=now), expected):
+            self.assertAlmostEqual(got, want, places=9)
+
+    def test_validate_or_die_reuses_compiled_validator_until_schema_changes(self):
+        schema_path = self.root / "schema.json"
+        schema_path.write_bytes(_dumps({"type": "object", "required": ["a"]}))
+        v1 = get_validator(schema_path)
+        self.assertIs(get_validator(schema_path), v1)
+        validate_or_die({"a": 1}, schema_path, label="thing")
+        with self.assertRaises(SystemExit) as ctx:
+            validate_or_die({}, schema_path, label="thing")
+        self.assertIn("invalid thing", str(ctx.exception))
+        # Diagnostics are jsonschema's best_match whichever backend ran the check.
+        self.assertEqual(get_validator(REFS / "model.schema.json")({"scope": "x"}), "'updatedAt' is a required property (at [])")
+
+        schema_path.write_bytes(_dumps({"type": "object", "required": ["b"]}))
+        os.utime(schema_path, ns=(0, schema_path.stat().st_mtime_ns + 1_000_000))
+        v2 = get_validator(schema_path)
+        self.assertIsNot(v2, v1)
+        validate_or_die({"b": 1}, schema_path, label="thing")
+
+        # An edit that keeps the mtime (coarse timestamps, or restored by a copy) still invalidates.
+        mtime_ns = schema_path.stat().st_mtime_ns
+        schema_path.write_bytes(_dumps({"type": "object", "required": ["cc"]}))
+        os.utime(schema_path, ns=(0, mtime_ns))
+        self.assertIsNot(get_validator(schema_path), v2)
+
+    def test_openclaw_routing_cache_misses_on_same_mtime_replace(self):
+        cfg_path = self.root / "openclaw.json"
+        cfg_path.write_bytes(_dumps({"agents": {"defaults": {"model": {"primary": "a/one"}}}}))
+        mtime_ns = cfg_path.stat().st_mtime_ns
+        with mock.patch.dict(os.environ, {"OPENCLAW_CONFIG_PATH": str(cfg_path)}):
+            self.assertEqual(_read_openclaw_routing()["primary"], "a/one")
+            staged = self.root / "openclaw.json.new"
+            staged.write_bytes(_dumps({"agents": {"defaults": {"model": {"primary": "b/second"}}}}))
+            os.utime(staged, ns=(0, mtime_ns))
+            os.replace(staged, cfg_path)
+            self.assertEqual(_read_openclaw_routing()["primary"], "b/second")
+
+    def test_read_text_with_offsets_misses_cache_on_same_mtime_edit(self):
+        path = self.root / "memory" / "2026-02-22.md"
+        self.assertTrue(read_text_with_offsets(path)[0].startswith("JD prefers"))
+        mtime_ns = path.stat().st_mtime_ns
+        path.write_text("x\ny\n", encoding="utf-8")
+        os.utime(path, ns=(0, mtime_ns))
+        self.assertEqual(read_text_with_offsets(path), ("x\ny\n", (0, 2, 4)))
+
+    def test_evidence_paths_resolve_under_filesystem_root_workspace(self):
+        rel = str((self.root / "memory" / "2026-02-22.md").resolve().relative_to("/"))
+        verify_evidence_sources([{"path": rel, "lines": "L1-L1", "quote": "JD prefers"}], Path("/"))
+        code, out, err = run([PY, str(SCRIPTS / "find_quote_lines.py"), "--workspace", "/", "--path", rel, "--quote", "JD prefers"])
+        self.assertEqual(code, 0, msg=err)
+        self.assertEqual(out.strip(), "L1-L1")
+
+        with self.assertRaises(SystemExit) as ctx:
+            verify_evidence_sources([{"path": "../model.json", "lines": "L1-L1", "quote": "x"}], self.root / "memory")
+        self.assertIn("evidence path escapes workspace", str(ctx.exception))
+
+    def test_find_quote_lines_output_passes_verifier_on_cr_and_invalid_utf8(self):
+        (self.root / "memory" / "legacy.md").write_bytes(b"alpha\rbeta\xff gamma\rdelta\r\nomega\n")
+        for quote, expected in (("beta gamma", "L2-L2"), ("delta", "L3-L3"), ("gamma\ndelta", "L2-L3")):
+            with self.subTest(quote=quote):
+                code, out, err = run([PY, str(SCRIPTS / "find_quote_lines.py"), "--workspace", str(self.root), "--path", "memory/legacy.md", "--quote", quote])
+                self.assertEqual(code, 0, msg=err)
+                self.assertEqual(out.strip(), expected)
+                verify_evidence_sources([{"path": "memory/legacy.md", "lines": out.strip(), "quote": quote}], self.root)
+
+    def test_find_quote_lines_maps_single_and_multi_line_quotes(self):
+        code, out, err = run([PY, str(SCRIPTS / "find_quote_lines.py"), "--workspace", str(self.root), "--path", "memory/2026-02-22.md", "--quote", "d", "--window", "9"])
+        self.assertEqual(code, 0, msg=err)
+        self.assertEqual(out.strip(), "L5-L6")
+        code, out, err = run([PY, str(SCRIPTS / "find_quote_lines.py"), "--workspace", str(self.root), "--path", "memory/2026-02-22.md", "--quote", "communication.\na"])
+        self.assertEqual(code, 0, msg=err)
+        # A multi-line quote widens the range to its last line so the citation verifies.
+        self.assertEqual(out.strip(), "L1-L2")
+        code, _, err = run([PY, str(SCRIPTS / "find_quote_lines.py"), "--workspace", str(self.root), "--path", "memory/2026-02-22.md", "--quote", "zzz"], capture=False)
+        self.assertEqual(code, 1)
+
     def test_build_model_handles_date_only_evidence_timestamp_without_datetime_crash(self):
         model = {
             "scope": "repos",
@@ -130,7 +386,7 @@ class ConnectDotsDeterministicCoreTests(unittest.TestCase):
             "candidate_moves": [],
             "do_not_store": [],
         }
-        self.model_path.write_text(json.dumps(model), encoding="utf-8")
+        self.model_path.write_bytes(_dumps(model))
 
         prop = self._proposal(scope="repos")
         prop["items"]["hypotheses"].append(
@@ -146,11 +402,11 @@ class ConnectDotsDeterministicCoreTests(unittest.TestCase):
                 ],
             }
         )
-        self.proposal_path.write_text(json.dumps(prop), encoding="utf-8")
+        self.proposal_path.write_bytes(_dumps(prop))
 
-        code, out, err = run(
+        code, _, err = run(
             [
-                "python3",
+                PY,
                 str(SCRIPTS / "build_model.py"),
                 "--scope",
                 "repos",
@@ -160,26 +416,17 @@ class ConnectDotsDeterministicCoreTests(unittest.TestCase):
                 str(self.model_path),
                 "--proposal",
                 str(self.proposal_path),
-            ]
+            ],
+            capture=False,
         )
         self.assertEqual(code, 0, msg=err)
-        updated = json.loads(self.model_path.read_text(encoding="utf-8"))
+        updated = _loads(self.model_path.read_bytes())
         self.assertEqual(updated["hypotheses"][0]["id"], "hyp.third_flagship_smart_port_allocator")
 
     def test_do_not_store_drops_matching_statement(self):
         # Seed model with do_not_store.
-        skeleton = {
-            "scope": "user-profile/preferences",
-            "updatedAt": "now",
-            "meta": {},
-            "confirmed_facts": [],
-            "hypotheses": [],
-            "stale_items": [],
-            "open_loops": [],
-            "candidate_moves": [],
-            "do_not_store": [{"pattern": "secret", "created_at": "now"}],
-        }
-        self.model_path.write_text(json.dumps(skeleton), encoding="utf-8")
+        skeleton = _model(do_not_store=[{"pattern": "secret", "created_at": "now"}])
+        self.model_path.write_bytes(_dumps(skeleton))
 
         prop = self._proposal()
         prop["items"]["hypotheses"].append(
@@ -191,11 +438,11 @@ class ConnectDotsDeterministicCoreTests(unittest.TestCase):
                 ],
             }
         )
-        self.proposal_path.write_text(json.dumps(prop), encoding="utf-8")
+        self.proposal_path.write_bytes(_dumps(prop))
 
-        code, out, err = run(
+        code, _, err = run(
             [
-                "python3",
+                PY,
                 str(SCRIPTS / "build_model.py"),
                 "--scope",
                 "user-profile/preferences",
@@ -205,161 +452,114 @@ class ConnectDotsDeterministicCoreTests(unittest.TestCase):
                 str(self.model_path),
                 "--proposal",
                 str(self.proposal_path),
-            ]
+            ],
+            capture=False,
         )
         self.assertEqual(code, 0, msg=err)
-        model = json.loads(self.model_path.read_text(encoding="utf-8"))
+        model = _loads(self.model_path.read_bytes())
         self.assertEqual(len(model["hypotheses"]), 0)
 
-    def test_consent_dont_store_adds_rule(self):
-        # Create a minimal valid model.
-        model = {
-            "scope": "user-profile/preferences",
-            "updatedAt": "now",
-            "meta": {},
-            "confirmed_facts": [],
-            "hypotheses": [],
-            "stale_items": [],
-            "open_loops": [],
-            "candidate_moves": [],
-            "do_not_store": [],
-        }
-        self.model_path.write_text(json.dumps(model), encoding="utf-8")
-        code, out, err = run(
-            [
-                "python3",
-                str(SCRIPTS / "consent_mutations.py"),
-                "--model",
-                str(self.model_path),
-                "--op",
-                "dont-store",
-                "--pattern",
-                "foo",
-            ]
+    def test_do_not_store_hit_with_bad_citation_is_dropped_not_fatal(self):
+        self.model_path.write_bytes(_dumps(_model(do_not_store=[{"pattern": "secret", "created_at": "now"}])))
+        prop = self._proposal()
+        prop["items"]["hypotheses"].append(
+            {
+                "id": "h1",
+                "statement": "This contains SECRET content.",
+                "evidence": [{"path": "memory/2026-02-22.md", "lines": "L1-L1", "quote": "not in the file"}],
+            }
         )
-        self.assertEqual(code, 0, msg=err)
-        m2 = json.loads(self.model_path.read_text(encoding="utf-8"))
-        self.assertEqual(m2["do_not_store"][0]["pattern"], "foo")
-
-    def test_consent_forget_retracts_by_id(self):
-        model = {
-            "scope": "user-profile/preferences",
-            "updatedAt": "now",
-            "meta": {},
-            "confirmed_facts": [],
-            "hypotheses": [
-                {
-                    "id": "h1",
-                    "statement": "A hypothesis",
-                    "confidence": 0.9,
-                    "first_seen": "t",
-                    "last_seen": "t",
-                    "expires_at": "2099-01-01T00:00:00+00:00",
-                    "status": "active",
-                    "evidence": [{"path": "memory/2026-02-22.md", "lines": "L1-L2", "quote": "a"}],
-                }
-            ],
-            "stale_items": [],
-            "open_loops": [],
-            "candidate_moves": [],
-            "do_not_store": [],
-        }
-        self.model_path.write_text(json.dumps(model), encoding="utf-8")
-        code, out, err = run(
+        code, _, err = run(
             [
-                "python3",
-                str(SCRIPTS / "consent_mutations.py"),
+                PY,
+                str(SCRIPTS / "build_model.py"),
+                "--scope",
+                "user-profile/preferences",
+                "--workspace",
+                str(self.root),
                 "--model",
                 str(self.model_path),
-                "--op",
-                "forget",
-                "--id",
-                "h1",
-            ]
+                "--proposal",
+                "-",
+            ],
+            input=json.dumps(prop),
+            capture=False,
         )
         self.assertEqual(code, 0, msg=err)
-        m2 = json.loads(self.model_path.read_text(encoding="utf-8"))
-        # hypotheses list drops retracted
-        self.assertEqual(len(m2["hypotheses"]), 0)
-
-    def test_confirm_promotes_hypothesis_to_fact(self):
-        model = {
-            "scope": "user-profile/preferences",
-            "updatedAt": "now",
-            "meta": {},
-            "confirmed_facts": [],
-            "hypotheses": [
-                {
-                    "id": "h1",
-                    "statement": "JD prefers concise communication.",
-                    "confidence": 0.8,
-                    "first_seen": "t",
-                    "last_seen": "t",
-                    "expires_at": "2099-01-01T00:00:00+00:00",
-                    "status": "active",
-                    "evidence": [{"path": "memory/2026-02-22.md", "lines": "L1-L2", "quote": "a"}],
-                }
-            ],
-            "stale_items": [],
-            "open_loops": [],
-            "candidate_moves": [],
-            "do_not_store": [],
-        }
-        self.model_path.write_text(json.dumps(model), encoding="utf-8")
-        code, out, err = run(
-            [
-                "python3",
-                str(SCRIPTS / "consent_mutations.py"),
-                "--model",
-                str(self.model_path),
-                "--op",
-                "confirm",
-                "--id",
-                "h1",
-                "--fact",
-                "Communication style",
-                "--value",
-                "concise",
-            ]
+        self.assertEqual(_loads(self.model_path.read_bytes())["hypotheses"], [])
+
+    def test_consent_mutations_single_ops(self):
+        for name, seed, argv, project, expected in CONSENT_CASES:
+            with self.subTest(name):
+                self.model_path.write_bytes(_dumps(_model(**copy.deepcopy(seed))))
+                code, _, err = run(
+                    [PY, str(SCRIPTS / "consent_mutations.py"), "--model", str(self.model_path), *argv],
+                    capture=False,
+                )
+                self.assertEqual(code, 0, msg=err)
+                self.assertEqual(project(_loads(self.model_path.read_bytes())), expected)
+
+    def test_consent_batch_applies_ops_in_order_and_fails_closed(self):
+        model = _model(hypotheses=[_hypothesis(), _hypothesis(id="h2", statement="JD works late")])
+        self.model_path.write_bytes(_dumps(model))
+        batch = self.root / "ops.jsonl"
+        batch.write_text(
+            "\n".join(
+                json.dumps(op)
+                for op in (
+                    {"op": "dont-store", "pattern": "foo"},
+                    {"op": "confirm", "id": "h1", "value": "concise"},
+                    {"op": "deny", "id": "h2"},
+                    # Resolves to the fact confirm just created.
+                    {"op": "deny", "id": "h1"},
+                )
+            ),
+            encoding="utf-8",
         )
+        code, _, err = run([PY, str(SCRIPTS / "consent_mutations.py"), "--model", str(self.model_path), "--batch", str(batch)], capture=False)
         self.assertEqual(code, 0, msg=err)
-        m2 = json.loads(self.model_path.read_text(encoding="utf-8"))
-        self.assertEqual(len(m2["hypotheses"]), 0)
-        self.assertEqual(len(m2["confirmed_facts"]), 1)
-        self.assertEqual(m2["confirmed_facts"][0]["value"], "concise")
+        m2 = _loads(self.model_path.read_bytes())
+        self.assertEqual(m2["do_not_store"][0]["pattern"], "foo")
+        self.assertEqual([(f["id"], f["status"]) for f in m2["confirmed_facts"]], [("h1", "retracted")])
+        self.assertEqual(m2["hypotheses"], [])
+
+        # A failing op aborts the whole batch before anything is written.
+        before = self.model_path.read_text(encoding="utf-8")
+        batch.write_text('{"op": "dont-store", "pattern": "bar"}\n{"op": "deny", "id": "missing"}\n', encoding="utf-8")
+        code, _, err = run([PY, str(SCRIPTS / "consent_mutations.py"), "--model", str(self.model_path), "--batch", str(batch)], capture=False)
+        self.assertNotEqual(code, 0)
+        self.assertIn("batch op 2 (deny): id not found: missing", err)
+        self.assertEqual(self.model_path.read_text(encoding="utf-8"), before)
+
+        # Non-string fields are rejected up front rather than crashing inside an op.
+        batch.write_text('{"op": "forget", "match": 5}\n', encoding="utf-8")
+        code, _, err = run([PY, str(SCRIPTS / "consent_mutations.py"), "--model", str(self.model_path), "--batch", str(batch)], capture=False)
+        self.assertNotEqual(code, 0)
+        self.assertIn("batch line 1: expected a string for: match", err)
+        self.assertEqual(self.model_path.read_text(encoding="utf-8"), before)
 
     def test_expired_item_moves_to_stale_when_not_refreshed(self):
         # Seed an expired hypothesis.
-        model = {
-            "scope": "user-profile/preferences",
-            "updatedAt": "now",
-            "meta": {},
-            "confirmed_facts": [],
-            "hypotheses": [
-                {
-                    "id": "h-exp",
-                    "statement": "Old hypothesis",
-                    "confidence": 0.9,
-                    "first_seen": "2026-01-01T00:00:00+00:00",
-                    "last_seen": "2026-01-01T00:00:00+00:00",
-                    "expires_at": "2000-01-01T00:00:00+00:00",
-                    "status": "active",
-                    "evidence": [{"path": "memory/2026-02-22.md", "lines": "L1-L2", "quote": "a"}],
-                }
-            ],
-            "stale_items": [],
-            "open_loops": [],
-            "candidate_moves": [],
-            "do_not_store": [],
-        }
-        self.model_path.write_text(json.dumps(model), encoding="utf-8")
+        model = _model(
+            hypotheses=[
+                _hypothesis(
+                    id="h-exp",
+                    statement="Old hypothesis",
+                    confidence=0.9,
+                    first_seen="2026-01-01T00:00:00+00:00",
+                    last_seen="2026-01-01T00:00:00+00:00",
+                    expires_at="2000-01-01T00:00:00+00:00",
+                )
+            ]
+        )
+        self.model_path.write_bytes(_dumps(model))
         # Proposal does not mention h-exp (not refreshed)
         prop = self._proposal()
-        self.proposal_path.write_text(json.dumps(prop), encoding="utf-8")
+        self.proposal_path.write_bytes(_dumps(prop))
 
-        code, out, err = run(
+        code, _, err = run(
             [
-                "python3",
+                PY,
                 str(SCRIPTS / "build_model.py"),
                 "--scope",
                 "user-profile/preferences",
@@ -369,70 +569,72 @@ class ConnectDotsDeterministicCoreTests(unittest.TestCase):
                 str(self.model_path),
                 "--proposal",
                 str(self.proposal_path),
-            ]
+            ],
+            capture=False,
         )
         self.assertEqual(code, 0, msg=err)
-        m2 = json.loads(self.model_path.read_text(encoding="utf-8"))
+        m2 = _loads(self.model_path.read_bytes())
         self.assertEqual(len(m2["hypotheses"]), 0)
         self.assertTrue(any(it.get("id") == "h-exp" for it in m2["stale_items"]))
 
+    def test_stale_dedup_prefers_dated_copy_over_undated(self):
+        dated = _hypothesis(id="s1", statement="Dated", status="stale", last_seen="2026-01-01T00:00:00+00:00")
+        for undated_last_seen in ("", "garbage"):
+            with self.subTest(last_seen=undated_last_seen):
+                undated = _hypothesis(id="s1", statement="Undated", status="stale", last_seen=undated_last_seen)
+                self.model_path.write_bytes(_dumps(_model(stale_items=[dated, undated])))
+                code, _, err = run(
+                    [
+                        PY,
+                        str(SCRIPTS / "build_model.py"),
+                        "--scope",
+                        "user-profile/preferences",
+                        "--workspace",
+                        str(self.root),
+                        "--model",
+                        str(self.model_path),
+                        "--proposal",
+                        "-",
+                    ],
+                    input=json.dumps(self._proposal()),
+                    capture=False,
+                )
+                self.assertEqual(code, 0, msg=err)
+                stale = _loads(self.model_path.read_bytes())["stale_items"]
+                self.assertEqual([it["statement"] for it in stale], ["Dated"])
+
+    def test_in_process_run_captures_output_and_usage_errors(self):
+        prev, cur = self.root / "prev.json", self.root / "cur.json"
+        prev.write_bytes(_dumps(_model()))
+        cur.write_bytes(_dumps(_model(hypotheses=[_hypothesis()])))
+        self.assertEqual(model_diff_run(["--prev", str(prev), "--cur", str(cur)]), (0, "+ JD prefers concise communication.\n", ""))
+
+        code, out, err = model_diff_run(["--prev", str(prev)])
+        self.assertEqual((code, out), (2, ""))
+        self.assertIn("the following arguments are required: --cur", err)
+
     def test_model_diff_outputs_diff_lines(self):
-        prev = {
-            "scope": "user-profile/preferences",
-            "updatedAt": "now",
-            "meta": {},
-            "confirmed_facts": [],
-            "hypotheses": [
-                {
-                    "id": "h1",
-                    "statement": "Old",
-                    "confidence": 0.5,
-                    "first_seen": "t",
-                    "last_seen": "t",
-                    "expires_at": "2099-01-01T00:00:00+00:00",
-                    "status": "active",
-                    "evidence": [{"path": "memory/2026-02-22.md", "lines": "L1-L2", "quote": "a"}],
-                }
-            ],
-            "stale_items": [],
-            "open_loops": [],
-            "candidate_moves": [],
-            "do_not_store": [],
-        }
-        cur = json.loads(json.dumps(prev))
+        prev = _model(hypotheses=[_hypothesis(statement="Old", confidence=0.5)])
+        cur = copy.deepcopy(prev)
         cur["hypotheses"][0]["statement"] = "New"
 
-        p1 = self.root / "prev.json"
-        p2 = self.root / "cur.json"
-        p1.write_text(json.dumps(prev), encoding="utf-8")
-        p2.write_text(json.dumps(cur), encoding="utf-8")
-
-        code, out, err = run(["python3", str(SCRIPTS / "model_diff.py"), "--prev", str(p1), "--cur", str(p2)])
-        self.assertEqual(code, 0)
-        self.assertIn("~", out)
+        self.assertEqual(diff_lines(prev, cur), ["~ New"])
 
     def test_render_assumptions_is_single_message(self):
-        model = {
-            "scope": "user-profile/preferences",
-            "updatedAt": "now",
-            "meta": {},
-            "confirmed_facts": [],
-            "hypotheses": [],
-            "stale_items": [],
-            "open_loops": [],
-            "candidate_moves": [],
-            "do_not_store": [],
-        }
-        self.model_path.write_text(json.dumps(model), encoding="utf-8")
-        code, out, err = run(["python3", str(SCRIPTS / "render_assumptions.py"), "--model", str(self.model_path)])
-        self.assertEqual(code, 0)
+        out = render_assumptions(_model())
         self.assertIn("Assumptions snapshot", out)
         # sanity: output is one block
         self.assertLess(out.count("\n\n\n"), 2)
 
+    def test_render_assumptions_treats_non_string_evidence_ts_as_undated(self):
+        for ts in (["2026-02-22"], {"at": "2026-02-22"}, 20260222):
+            with self.subTest(ts=ts):
+                hyp = _hypothesis(evidence=[{"path": "memory/2026-02-22.md", "lines": "L1-L1", "quote": "JD", "ts": ts}])
+                self.assertIn("JD prefers concise communication.", render_assumptions(_model(hypotheses=[hyp])))
+
     def test_policy_guard_classifies_and_refuses_external_surface_without_approval(self):
         code, out, err = run([
-            "python3",
+            PY,
             str(SCRIPTS / "policy_guard.py"),
             "--scope",
             "repos",
@@ -446,25 +648,12 @@ class ConnectDotsDeterministicCoreTests(unittest.TestCase):
         self.assertIn('"blast_radius": "external-facing"', out)
 
     def test_render_assumptions_refuses_external_surface_without_approval(self):
-        model = {
-            "scope": "user-profile/preferences",
-            "updatedAt": "now",
-            "meta": {},
-            "confirmed_facts": [],
-            "hypotheses": [],
-            "stale_items": [],
-            "open_loops": [],
-            "candidate_moves": [],
-            "do_not_store": [],
-        }
-        self.model_path.write_text(json.dumps(model), encoding="utf-8")
-        code, out, err = run([
-            "python3",
-            str(SCRIPTS / "render_assumptions.py"),
-            "--model",
-            str(self.model_path),
-            "--external",
-        ])
+        model = _model()
+        code, _, err = run(
+            [PY, str(SCRIPTS / "render_assumptions.py"), "--model", "-", "--external"],
+            input=json.dumps(model),
+            capture=False,
+        )
         self.assertEqual(code, 2)
         self.assertIn("REFUSED:", err)
 
@@ -475,7 +664,7 @@ class ConnectDotsDeterministicCoreTests(unittest.TestCase):
         anti_path = ws / "anti.json"
         run_path = ws / "run-score.json"
 
-        lessons_path.write_text(json.dumps({"lessons": [{
+        lessons_path.write_bytes(_dumps({"lessons": [{
             "id": "lesson-1",
             "status": "active",
             "scope": ["repos"],
@@ -487,9 +676,9 @@ class ConnectDotsDeterministicCoreTests(unittest.TestCase):
             "created_at": "t",
             "updated_at": "t",
             "source_runs": ["a", "b"]
-        }]}), encoding="utf-8")
-        anti_path.write_text(json.dumps({"anti_patterns": []}), encoding="utf-8")
-        run_path.write_text(json.dumps({
+        }]}))
+        anti_path.write_bytes(_dumps({"anti_patterns": []}))
+        run_path.write_bytes(_dumps({
             "run_id": "run-score-1",
             "mode": "nightly",
             "trigger": "nightly_inactivity_gate",
@@ -508,16 +697,16 @@ class ConnectDotsDeterministicCoreTests(unittest.TestCase):
                 "validation": {"schema_ok": True, "citations_ok": True, "policy_ok": True},
                 "outcome": {"status": "silent", "notes": "x"}
             }]
-        }), encoding="utf-8")
+        }))
 
-        code, out, err = run(["python3", str(SCRIPTS / "feedback_store.py"), "--store", str(feedback_path), "--run-id", "run-score-1", "--scope", "repos", "--signal-key", "repos|safe-local-proposal|proposal|repo_review", "--verdict", "not-useful"], cwd=str(ws))
+        code, _, err = run([PY, str(SCRIPTS / "feedback_store.py"), "--store", str(feedback_path), "--run-id", "run-score-1", "--scope", "repos", "--signal-key", "repos|safe-local-proposal|proposal|repo_review", "--verdict", "not-useful"], cwd=str(ws), capture=False)
         self.assertEqual(code, 0, msg=err)
-        code, out, err = run(["python3", str(SCRIPTS / "feedback_store.py"), "--store", str(feedback_path), "--run-id", "run-score-2", "--scope", "repos", "--signal-key", "repos|safe-local-proposal|proposal|repo_review", "--verdict", "not-useful"], cwd=str(ws))
+        code, _, err = run([PY, str(SCRIPTS / "feedback_store.py"), "--store", str(feedback_path), "--run-id", "run-score-2", "--scope", "repos", "--signal-key", "repos|safe-local-proposal|proposal|repo_review", "--verdict", "not-useful"], cwd=str(ws), capture=False)
         self.assertEqual(code, 0, msg=err)
 
-        code, out, err = run(["python3", str(SCRIPTS / "score_recommendation.py"), "--run", str(run_path), "--lessons", str(lessons_path), "--anti-patterns", str(anti_path), "--feedback", str(feedback_path)], cwd=str(ws))
+        code, out, err = run([PY, str(SCRIPTS / "score_recommendation.py"), "--run", str(run_path), "--lessons", str(lessons_path), "--anti-patterns", str(anti_path), "--feedback", str(feedback_path)], cwd=str(ws))
         self.assertEqual(code, 0, msg=err)
-        scored = json.loads(out)
+        scored = _loads(out)
         self.assertEqual(scored["decisions"][0]["suppressed"], True)
         self.assertEqual(scored["decisions"][0]["reason"], "repeated_negative_feedback")
 
@@ -525,9 +714,9 @@ class ConnectDotsDeterministicCoreTests(unittest.TestCase):
         ws = self.root
         feedback_path = ws / "feedback.json"
 
-        code, out, err = run(
+        code, _, err = run(
             [
-                "python3",
+                PY,
                 str(SCRIPTS / "feedback_store.py"),
                 "--store",
                 str(feedback_path),
@@ -541,9 +730,10 @@ class ConnectDotsDeterministicCoreTests(unittest.TestCase):
                 "too-noisy",
             ],
             cwd=str(ws),
+            capture=False,
         )
         self.assertEqual(code, 0, msg=err)
-        stored = json.loads(feedback_path.read_text(encoding="utf-8"))
+        stored = _loads(feedback_path.read_bytes())
         self.assertEqual(stored["feedback"][0]["verdict"], "not-useful")
         self.assertIn("alias:too-noisy", stored["feedback"][0]["note"])
 
@@ -558,13 +748,13 @@ class ConnectDotsDeterministicCoreTests(unittest.TestCase):
         lessons_path = ws / "lessons.json"
         anti_path = ws / "anti.json"
         feedback_path = ws / "feedback.json"
-        lessons_path.write_text(json.dumps({"lessons": []}), encoding="utf-8")
-        anti_path.write_text(json.dumps({"anti_patterns": []}), encoding="utf-8")
-        feedback_path.write_text(json.dumps({"feedback": []}), encoding="utf-8")
+        lessons_path.write_bytes(_dumps({"lessons": []}))
+        anti_path.write_bytes(_dumps({"anti_patterns": []}))
+        feedback_path.write_bytes(_dumps({"feedback": []}))
 
-        code, out, err = run(
+        code, _, err = run(
             [
-                "python3",
+                PY,
                 str(SCRIPTS / "write_run_record.py"),
                 "--workspace",
                 str(ws),
@@ -584,9 +774,10 @@ class ConnectDotsDeterministicCoreTests(unittest.TestCase):
                 "repos:success",
             ],
             cwd=str(ws),
+            capture=False,
         )
         self.assertEqual(code, 0, msg=err)
-        run_json = json.loads((ws / "tmp" / "connect-dots" / "runs" / run_id / "run.json").read_text(encoding="utf-8"))
+        run_json = _loads((ws / "tmp" / "connect-dots" / "runs" / run_id / "run.json").read_bytes())
         self.assertEqual(run_json["status"], "success")
         self.assertEqual(run_json["scopes"][0]["scope"], "repos")
         self.assertEqual(run_json["scopes"][0]["lane"], "safe-local-proposal")
@@ -621,19 +812,19 @@ class ConnectDotsDeterministicCoreTests(unittest.TestCase):
                 "candidate_moves": [],
             },
         }
-        (scope_dir / "proposal.json").write_text(json.dumps(proposal), encoding="utf-8")
+        (scope_dir / "proposal.json").write_bytes(_dumps(proposal))
         (scope_dir / "diff.txt").write_text("(no material changes)\n", encoding="utf-8")
         (scope_dir / "error.log").write_text("", encoding="utf-8")
         lessons_path = ws / "lessons.json"
         anti_path = ws / "anti.json"
         feedback_path = ws / "feedback.json"
-        lessons_path.write_text(json.dumps({"lessons": []}), encoding="utf-8")
-        anti_path.write_text(json.dumps({"anti_patterns": []}), encoding="utf-8")
-        feedback_path.write_text(json.dumps({"feedback": []}), encoding="utf-8")
+        lessons_path.write_bytes(_dumps({"lessons": []}))
+        anti_path.write_bytes(_dumps({"anti_patterns": []}))
+        feedback_path.write_bytes(_dumps({"feedback": []}))
 
-        code, out, err = run(
+        code, _, err = run(
             [
-                "python3",
+                PY,
                 str(SCRIPTS / "write_run_record.py"),
                 "--workspace",
                 str(ws),
@@ -653,9 +844,10 @@ class ConnectDotsDeterministicCoreTests(unittest.TestCase):
                 "repos:success",
             ],
             cwd=str(ws),
+            capture=False,
         )
         self.assertEqual(code, 0, msg=err)
-        run_json = json.loads((ws / "tmp" / "connect-dots" / "runs" / run_id / "run.json").read_text(encoding="utf-8"))
+        run_json = _loads((ws / "tmp" / "connect-dots" / "runs" / run_id / "run.json").read_bytes())
         ev = run_json["scopes"][0]["hypothesis"]["evidence"][0]
         self.assertEqual(ev["path"], "memory/2026-02-22.md")
         self.assertEqual(ev["quote"], "JD prefers concise communication.")
@@ -673,13 +865,13 @@ class ConnectDotsDeterministicCoreTests(unittest.TestCase):
         lessons_path = ws / "lessons.json"
         anti_path = ws / "anti.json"
         feedback_path = ws / "feedback.json"
-        lessons_path.write_text(json.dumps({"lessons": []}), encoding="utf-8")
-        anti_path.write_text(json.dumps({"anti_patterns": []}), encoding="utf-8")
-        feedback_path.write_text(json.dumps({"feedback": []}), encoding="utf-8")
+        lessons_path.write_bytes(_dumps({"lessons": []}))
+        anti_path.write_bytes(_dumps({"anti_patterns": []}))
+        feedback_path.write_bytes(_dumps({"feedback": []}))
 
-        code, out, err = run(
+        code, _, err = run(
             [
-                "python3",
+                PY,
                 str(SCRIPTS / "write_run_record.py"),
                 "--workspace",
                 str(ws),
@@ -699,9 +891,10 @@ class ConnectDotsDeterministicCoreTests(unittest.TestCase):
                 "repos:failed",
             ],
             cwd=str(ws),
+            capture=False,
         )
         self.assertEqual(code, 0, msg=err)
-        run_json = json.loads((ws / "tmp" / "connect-dots" / "runs" / run_id / "run.json").read_text(encoding="utf-8"))
+        run_json = _loads((ws / "tmp" / "connect-dots" / "runs" / run_id / "run.json").read_bytes())
         self.assertFalse(run_json["scopes"][0]["validation"]["citations_ok"])
 
     def test_update_lessons_promotes_after_second_distinct_run(self):
@@ -736,18 +929,18 @@ class ConnectDotsDeterministicCoreTests(unittest.TestCase):
             "validation": {"schema_ok": True, "citations_ok": True, "policy_ok": True},
             "scopes": [base_scope],
         }
-        run1.write_text(json.dumps(run_payload), encoding="utf-8")
-        code, out, err = run(["python3", str(SCRIPTS / "update_lessons.py"), "--run", str(run1), "--store", str(lessons_path)], cwd=str(ws))
+        run1.write_bytes(_dumps(run_payload))
+        code, _, err = run([PY, str(SCRIPTS / "update_lessons.py"), "--run", str(run1), "--store", str(lessons_path)], cwd=str(ws), capture=False)
         self.assertEqual(code, 0, msg=err)
-        lessons = json.loads(lessons_path.read_text(encoding="utf-8"))
+        lessons = _loads(lessons_path.read_bytes())
         self.assertEqual(lessons["lessons"][0]["status"], "pending")
         self.assertEqual(len(lessons["lessons"][0]["source_runs"]), 1)
 
         run_payload["run_id"] = "run-2"
-        run2.write_text(json.dumps(run_payload), encoding="utf-8")
-        code, out, err = run(["python3", str(SCRIPTS / "update_lessons.py"), "--run", str(run2), "--store", str(lessons_path)], cwd=str(ws))
+        run2.write_bytes(_dumps(run_payload))
+        code, _, err = run([PY, str(SCRIPTS / "update_lessons.py"), "--run", str(run2), "--store", str(lessons_path)], cwd=str(ws), capture=False)
         self.assertEqual(code, 0, msg=err)
-        lessons = json.loads(lessons_path.read_text(encoding="utf-8"))
+        lessons = _loads(lessons_path.read_bytes())
         self.assertEqual(lessons["lessons"][0]["status"], "active")
         self.assertEqual(len(lessons["lessons"][0]["source_runs"]), 2)
 
@@ -780,10 +973,10 @@ class ConnectDotsDeterministicCoreTests(unittest.TestCase):
                 "outcome": {"status": "failed", "notes": "bad schema"}
             }],
         }
-        run1.write_text(json.dumps(run_payload), encoding="utf-8")
-        code, out, err = run(["python3", str(SCRIPTS / "update_anti_patterns.py"), "--run", str(run1), "--store", str(anti_path)], cwd=str(ws))
+        run1.write_bytes(_dumps(run_payload))
+        code, _, err = run([PY, str(SCRIPTS / "update_anti_patterns.py"), "--run", str(run1), "--store", str(anti_path)], cwd=str(ws), capture=False)
         self.assertEqual(code, 0, msg=err)
-        anti = json.loads(anti_path.read_text(encoding="utf-8"))
+        anti = _loads(anti_path.read_bytes())
         self.assertEqual(len(anti["anti_patterns"]), 1)
         self.assertEqual(anti["anti_patterns"][0]["severity"], "high")
         self.assertIn("schema_failure", anti["anti_patterns"][0]["trigger_signals"])
@@ -848,19 +1041,19 @@ class ConnectDotsDeterministicCoreTests(unittest.TestCase):
                 "recommendation_score": {"score": 0.3, "suppressed": True, "reason": "repeated_negative_feedback"}
             }]
         }
-        (insights / "lessons.json").write_text(json.dumps(lessons), encoding="utf-8")
-        (insights / "anti-patterns.json").write_text(json.dumps(anti), encoding="utf-8")
-        (insights / "feedback.json").write_text(json.dumps(feedback), encoding="utf-8")
-        ((ws / "tmp" / "connect-dots" / "runs" / "r1") / "run.json").write_text(json.dumps(run_json), encoding="utf-8")
+        (insights / "lessons.json").write_bytes(_dumps(lessons))
+        (insights / "anti-patterns.json").write_bytes(_dumps(anti))
+        (insights / "feedback.json").write_bytes(_dumps(feedback))
+        ((ws / "tmp" / "connect-dots" / "runs" / "r1") / "run.json").write_bytes(_dumps(run_json))
 
-        code, out, err = run(["python3", str(SCRIPTS / "doctor.py"), "--workspace", str(ws)], cwd=str(ws))
+        code, out, err = run([PY, str(SCRIPTS / "doctor.py"), "--workspace", str(ws)], cwd=str(ws))
         self.assertEqual(code, 0, msg=err)
         self.assertIn("connect-dots doctor", out)
         self.assertIn("lesson-old", out)
         self.assertIn("repo_review", out)
         self.assertIn("repeated_negative_feedback", out)
 
-        code, out, err = run(["python3", str(SCRIPTS / "review_checkpoint.py"), "--workspace", str(ws), "--label", "2-week review"], cwd=str(ws))
+        code, out, err = run([PY, str(SCRIPTS / "review_checkpoint.py"), "--workspace", str(ws), "--label", "2-week review"], cwd=str(ws))
         self.assertEqual(code, 0, msg=err)
         self.assertIn("connect-dots 2-week review", out)
         self.assertIn("Pending decisions", out)
@@ -878,11 +1071,11 @@ class ConnectDotsDeterministicCoreTests(unittest.TestCase):
         )
 
         code, out, err = run(
-            ["python3", str(SCRIPTS / "pending_decisions.py"), "parse", "--workspace", str(ws)],
+            [PY, str(SCRIPTS / "pending_decisions.py"), "parse", "--workspace", str(ws)],
             cwd=str(ws),
         )
         self.assertEqual(code, 0, msg=err)
-        data = json.loads(out)
+        data = _loads(out)
         self.assertEqual(data["active"][0]["id"], "PD-0001")
         self.assertEqual(data["resolved"][0]["id"], "PD-0002")
 
@@ -913,11 +1106,11 @@ class ConnectDotsDeterministicCoreTests(unittest.TestCase):
             },
         }
         candidate_path = ws / "candidate.json"
-        candidate_path.write_text(json.dumps(candidate), encoding="utf-8")
+        candidate_path.write_bytes(_dumps(candidate))
 
         code, out, err = run(
             [
-                "python3",
+                PY,
                 str(SCRIPTS / "pending_decisions.py"),
                 "prepare-proposal",
                 "--workspace",
@@ -928,7 +1121,7 @@ class ConnectDotsDeterministicCoreTests(unittest.TestCase):
             cwd=str(ws),
         )
         self.assertEqual(code, 0, msg=err)
-        data = json.loads(out)
+        data = _loads(out)
         self.assertEqual(data["status"], "proposal-ready")
         self.assertEqual(data["next_id"], "PD-0002")
         self.assertIn("Career / forum follow-up", data["entry_markdown"])
@@ -959,11 +1152,11 @@ class ConnectDotsDeterministicCoreTests(unittest.TestCase):
             },
         }
         candidate_path = ws / "candidate-bad.json"
-        candidate_path.write_text(json.dumps(candidate), encoding="utf-8")
+        candidate_path.write_bytes(_dumps(candidate))
 
-        code, out, err = run(
+        code, _, err = run(
             [
-                "python3",
+                PY,
                 str(SCRIPTS / "pending_decisions.py"),
                 "prepare-proposal",
                 "--workspace",
@@ -972,6 +1165,7 @@ class ConnectDotsDeterministicCoreTests(unittest.TestCase):
                 str(candidate_path),
             ],
             cwd=str(ws),
+            capture=False,
         )
         self.assertNotEqual(code, 0)
         self.assertIn("explicit defer signal", err)
@@ -1014,11 +1208,11 @@ class ConnectDotsDeterministicCoreTests(unittest.TestCase):
         }
         proposal_path = ws / "proposal.json"
         out_path = ws / "candidates.json"
-        proposal_path.write_text(json.dumps(proposal), encoding="utf-8")
+        proposal_path.write_bytes(_dumps(proposal))
 
         code, out, err = run(
             [
-                "python3",
+                PY,
                 str(SCRIPTS / "pending_decisions.py"),
                 "extract-from-proposal",
                 "--workspace",
@@ -1031,7 +1225,7 @@ class ConnectDotsDeterministicCoreTests(unittest.TestCase):
             cwd=str(ws),
         )
         self.assertEqual(code, 0, msg=err)
-        data = json.loads(out)
+        data = _loads(out)
         self.assertEqual(data["count"], 1)
         self.assertEqual(data["items"][0]["status"], "proposal-ready")
         self.assertIn("ItemXlate / execution", data["items"][0]["entry_markdown"])
@@ -1077,11 +1271,11 @@ class ConnectDotsDeterministicCoreTests(unittest.TestCase):
                 "candidate_moves": [],
             },
         }
-        (scope_dir / "proposal.json").write_text(json.dumps(proposal), encoding="utf-8")
+        (scope_dir / "proposal.json").write_bytes(_dumps(proposal))
 
-        code, out, err = run(
+        code, _, err = run(
             [
-                "python3",
+                PY,
                 str(SCRIPTS / "nightly_run.py"),
                 "--workspace",
                 str(ws),
@@ -1093,13 +1287,61 @@ class ConnectDotsDeterministicCoreTests(unittest.TestCase):
                 run_id,
             ],
             cwd=str(ws),
+            capture=False,
         )
         self.assertEqual(code, 0, msg=err)
         candidates_path = scope_dir / "pending_decision_candidates.json"
         self.assertTrue(candidates_path.exists())
-        data = json.loads(candidates_path.read_text(encoding="utf-8"))
+        data = _loads(candidates_path.read_bytes())
         self.assertEqual(data["count"], 1)
 
+    def test_nightly_run_phase2_applies_dry_run_model_on_top_of_existing(self):
+        ws = self.root
+        run_id = "t-apply-0001"
+        scope_dir = ws / "tmp" / "connect-dots" / "runs" / run_id / "repos"
+        scope_dir.mkdir(parents=True, exist_ok=True)
+        model_path = ws / "memory" / "internal" / "connect-dots" / "repos" / "model.json"
+        model_path.parent.mkdir(parents=True, exist_ok=True)
+        evidence = [{"path": "memory/2026-02-22.md", "lines": "L1-L1", "quote": "JD prefers", "ts": "2026-02-22T00:00:00+01:00"}]
+        existing = {
+            "scope": "repos",
+            "updatedAt": "2026-02-22T00:00:00+01:00",
+            "meta": {},
+            "confirmed_facts": [],
+            "hypotheses": [
+                {
+                    "id": "h0",
+                    "statement": "Existing hypothesis.",
+                    "confidence": 0.5,
+                    "first_seen": "2026-02-22T00:00:00+01:00",
+                    "last_seen": "2026-02-22T00:00:00+01:00",
+                    "expires_at": "2999-01-01T00:00:00+00:00",
+                    "status": "active",
+                    "evidence": evidence,
+                }
+            ],
+            "stale_items": [],
+            "open_loops": [],
+            "candidate_moves": [],
+            "do_not_store": [],
+        }
+        model_path.write_bytes(_dumps(existing))
+        prop = self._proposal(scope="repos")
+        prop["items"]["hypotheses"].append({"id": "h1", "statement": "New hypothesis.", "evidence": evidence})
+        (scope_dir / "proposal.json").write_bytes(_dumps(prop))
+
+        code, _, err = run(
+            [PY, str(SCRIPTS / "nightly_run.py"), "--workspace", str(ws), "--phase", "2", "--scopes", "repos", "--run-id", run_id],
+            cwd=str(ws),
+            capture=False,
+        )
+        self.assertEqual(code, 0, msg=err)
+        applied = _loads(model_path.read_bytes())
+        self.assertEqual(sorted(h["id"] for h in applied["hypotheses"]), ["h0", "h1"])
+        self.assertEqual(_loads((scope_dir / "model.post.json").read_bytes()), applied)
+        self.assertFalse((scope_dir / "model.tmp.json").exists())
+        self.assertIn("+ New hypothesis.", (scope_dir / "diff.txt").read_text(encoding="utf-8"))
+
     def test_nightly_run_patches_runtime_routing_fact_with_workspace_snapshot(self):
         # Build a minimal workspace layout.
         ws = self.root
@@ -1125,11 +1367,11 @@ class ConnectDotsDeterministicCoreTests(unittest.TestCase):
             }
         }
         cfg_path = ws / "fake-openclaw.json"
-        cfg_path.write_text(json.dumps(cfg), encoding="utf-8")
+        cfg_path.write_bytes(_dumps(cfg))
 
         jobs_path = ws / "fake-cron-jobs.json"
-        jobs_path.write_text(
-            json.dumps(
+        jobs_path.write_bytes(
+            _dumps(
                 [
                     {
                         "name": "connect-dots-nightly",
@@ -1140,8 +1382,7 @@ class ConnectDotsDeterministicCoreTests(unittest.TestCase):
                         },
                     }
                 ]
-            ),
-            encoding="utf-8",
+            )
         )
 
         # Proposal includes stale runtime facts; nightly_run should rewrite them to cite workspace-local
@@ -1187,16 +1428,13 @@ class ConnectDotsDeterministicCoreTests(unittest.TestCase):
                 "candidate_moves": [],
             },
         }
-        (scope_dir / "proposal.json").write_text(json.dumps(proposal), encoding="utf-8")
-
-        old = os.environ.get("OPENCLAW_CONFIG_PATH")
-        old_jobs = os.environ.get("OPENCLAW_CRON_JOBS_PATH")
-        os.environ["OPENCLAW_CONFIG_PATH"] = str(cfg_path)
-        os.environ["OPENCLAW_CRON_JOBS_PATH"] = str(jobs_path)
-        try:
-            code, out, err = run(
+        (scope_dir / "proposal.json").write_bytes(_dumps(proposal))
+
+        env = {"OPENCLAW_CONFIG_PATH": str(cfg_path), "OPENCLAW_CRON_JOBS_PATH": str(jobs_path)}
+        with mock.patch.dict(os.environ, env):
+            code, _, err = run(
                 [
-                    "python3",
+                    PY,
                     str(SCRIPTS / "nightly_run.py"),
                     "--workspace",
                     str(ws),
@@ -1208,16 +1446,8 @@ class ConnectDotsDeterministicCoreTests(unittest.TestCase):
                     run_id,
                 ],
                 cwd=str(ws),
+                capture=False,
             )
-        finally:
-            if old is None:
-                os.environ.pop("OPENCLAW_CONFIG_PATH", None)
-            else:
-                os.environ["OPENCLAW_CONFIG_PATH"] = old
-            if old_jobs is None:
-                os.environ.pop("OPENCLAW_CRON_JOBS_PATH", None)
-            else:
-                os.environ["OPENCLAW_CRON_JOBS_PATH"] = old_jobs
 
         self.assertEqual(code, 0, msg=err)
 
@@ -1226,7 +1456,7 @@ class ConnectDotsDeterministicCoreTests(unittest.TestCase):
         nightly_snap = scope_dir / "nightly-model-pin.txt"
         self.assertTrue(nightly_snap.exists())
 
-        patched = json.loads((scope_dir / "proposal.json").read_text(encoding="utf-8"))
+        patched = _loads((scope_dir / "proposal.json").read_bytes())
         facts = {fact["id"]: fact for fact in patched["items"]["confirmed_facts"]}
         self.assertEqual(len(facts), 2)
 
@@ -1250,18 +1480,18 @@ class ConnectDotsDeterministicCoreTests(unittest.TestCase):
         self.assertEqual(nightly_ev[1]["quote"], "thinking: high")
 
         # A phase-B run record should also be emitted.
-        run_json = json.loads((ws / "tmp" / "connect-dots" / "runs" / run_id / "run.json").read_text(encoding="utf-8"))
+        run_json = _loads((ws / "tmp" / "connect-dots" / "runs" / run_id / "run.json").read_bytes())
         self.assertEqual(run_json["mode"], "nightly")
         self.assertEqual(run_json["trigger"], "nightly_inactivity_gate")
         self.assertEqual(run_json["status"], "success")
         self.assertEqual(run_json["scopes"][0]["scope"], "openclaw-runtime/ops")
 
         # Phase C: internal insights stores should be updated.
-        lessons = json.loads((ws / "memory" / "internal" / "connect-dots" / "insights" / "lessons.json").read_text(encoding="utf-8"))
+        lessons = _loads((ws / "memory" / "internal" / "connect-dots" / "insights" / "lessons.json").read_bytes())
         self.assertEqual(len(lessons["lessons"]), 1)
         self.assertEqual(lessons["lessons"][0]["status"], "pending")
         anti_path = ws / "memory" / "internal" / "connect-dots" / "insights" / "anti-patterns.json"
-        anti = json.loads(anti_path.read_text(encoding="utf-8"))
+        anti = _loads(anti_path.read_bytes())
         self.assertEqual(anti["anti_patterns"], [])
 
 
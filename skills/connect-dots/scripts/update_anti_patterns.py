@@ -7,7 +7,7 @@ import argparse
 from pathlib import Path
 from typing import Any, Dict, List, Tuple
 
-from _lib import atomic_write_json, load_json, now_iso, validate_or_die
+from _lib import atomic_write_json, load_json, now_iso, run_main, validate_or_die
 
 
 def _slug(text: str) -> str:
@@ -54,7 +54,7 @@ def _classify(scope_run: Dict[str, Any]) -> Tuple[str, str, str, List[str]] | No
     )
 
 
-def main() -> int:
+def main(argv: list[str] | None = None) -> int:
     ap = argparse.ArgumentParser()
     ap.add_argument("--run", required=True, help="Path to run.json")
     ap.add_argument("--store", required=True, help="Path to anti-patterns.json")
@@ -62,7 +62,7 @@ def main() -> int:
         "--schema",
         default=str(Path(__file__).resolve().parent.parent / "references" / "anti-patterns.schema.json"),
     )
-    args = ap.parse_args()
+    args = ap.parse_args(argv)
 
     run_path = Path(args.run)
     store_path = Path(args.store)
@@ -112,5 +112,10 @@ def main() -> int:
     return 0
 
 
+def run(argv: list[str]) -> tuple[int, str, str]:
+    """In-process entry point for callers that would otherwise spawn this script."""
+    return run_main(main, argv)
+
+
 if __name__ == "__main__":
     raise SystemExit(main())
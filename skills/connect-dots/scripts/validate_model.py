@@ -4,7 +4,9 @@
 Fail closed: exits non-zero on any schema mismatch.
 
 Usage:
-  validate_model.py --model <path> [--schema <schemaPath>]
+  validate_model.py --model <path|-> [--schema <schemaPath>]
+
+Pass `--model -` to read the model from stdin.
 """
 
 from __future__ import annotations
@@ -12,7 +14,7 @@ from __future__ import annotations
 import argparse
 from pathlib import Path
 
-from _lib import load_json, validate_or_die
+from _lib import load_json_arg, validate_or_die
 
 
 def main() -> int:
@@ -24,10 +26,9 @@ def main() -> int:
     )
     args = ap.parse_args()
 
-    model_path = Path(args.model)
     schema_path = Path(args.schema)
-    model = load_json(model_path)
-    validate_or_die(model, schema_path, label=f"model ({model_path})")
+    model = load_json_arg(args.model)
+    validate_or_die(model, schema_path, label=f"model ({'<stdin>' if args.model == '-' else args.model})")
     return 0
 
 
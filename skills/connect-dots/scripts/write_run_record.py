@@ -20,7 +20,7 @@ import json
 from pathlib import Path
 from typing import Any, Dict, List
 
-from _lib import atomic_write_json, load_json, now_iso, validate_or_die
+from _lib import atomic_write_json, load_json, now_iso, run_main, validate_or_die
 from policy_guard import enforce_policy
 from score_recommendation import score_scope
 
@@ -247,7 +247,7 @@ def build_scope_record(*, workspace: Path, run_dir: Path, scope: str, status: st
     return record
 
 
-def main() -> int:
+def main(argv: list[str] | None = None) -> int:
     ap = argparse.ArgumentParser()
     ap.add_argument("--workspace", required=True)
     ap.add_argument("--run-id", required=True)
@@ -263,7 +263,7 @@ def main() -> int:
         "--schema",
         default=str(Path(__file__).resolve().parent.parent / "references" / "run.schema.json"),
     )
-    args = ap.parse_args()
+    args = ap.parse_args(argv)
 
     workspace = Path(args.workspace).resolve()
     run_dir = workspace / "tmp" / "connect-dots" / "runs" / args.run_id
@@ -317,5 +317,10 @@ def main() -> int:
     return 0
 
 
+def run(argv: list[str]) -> tuple[int, str, str]:
+    """In-process entry point for callers that would otherwise spawn this script."""
+    return run_main(main, argv)
+
+
 if __name__ == "__main__":
     raise SystemExit(main())